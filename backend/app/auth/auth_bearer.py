@@ -6,11 +6,18 @@ class JWTBearer(HTTPBearer):
     async def __call__(self, request: Request):
         credentials: HTTPAuthorizationCredentials = await super().__call__(request)
         if credentials:
-            if not self.verify_jwt(credentials.credentials):
+            payload = verify_token(credentials.credentials)
+            if not payload:
                 raise HTTPException(status_code=403, detail="Token inválido")
+            # Reaproveitado por get_current_user para não decodificar o token de novo
+            request.state.token_payload = payload
             return credentials.credentials
         else:
-            raise HTTPException(status_code=403, detail="Token não fornecido")
+            raise HTTPException(
+                status_code=401,
+                detail="Token não fornecido",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
 
     def verify_jwt(self, jwt_token: str) -> bool:
         payload = verify_token(jwt_token)
@@ -4,11 +4,14 @@ from jose import jwt
 import os
 from dotenv import load_dotenv
 from fastapi import Depends, HTTPException, status, Request
-from sqlalchemy.orm import Session
-from app.core.database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_async_db
 from app.models.models import User
 from app.auth.auth_bearer import JWTBearer
 from app.auth.token_utils import verify_token
+from app.auth.user_cache import user_cache
+from app.core.logging_config import user_id_var
 
 load_dotenv()
 
@@ -16,6 +19,11 @@ SECRET_KEY = os.getenv("SECRET_KEY")
 if not SECRET_KEY:
     raise RuntimeError("SECRET_KEY environment variable is not set")
 
+# E-mails (separados por vírgula) com acesso às rotas administrativas
+ADMIN_EMAILS = {
+    email.strip().lower() for email in os.getenv("ADMIN_EMAILS", "").split(",") if email.strip()
+}
+
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60  # 1 hora
 
@@ -31,12 +39,13 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def get_current_user(
+async def get_current_user(
     request: Request,
-    token: str = Depends(JWTBearer()),
-    db: Session = Depends(get_db)
+    # auto_error=False: sem token, o próprio JWTBearer responde 401 (e não o 403 do HTTPBearer)
+    token: str = Depends(JWTBearer(auto_error=False)),
+    db: AsyncSession = Depends(get_async_db)
 ) -> User:
-    payload = verify_token(token)
+    payload = getattr(request.state, "token_payload", None) or verify_token(token)
 
     if not payload or "id" not in payload:
         raise HTTPException(
@@ -45,14 +54,30 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    user = db.query(User).filter(User.id == payload["id"], User.is_active == True).first()
+    user = user_cache.get(payload["id"])
     if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Usuário não encontrado",
+        user = await db.scalar(
+            select(User).where(User.id == payload["id"], User.is_active == True)
         )
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Usuário não encontrado",
+            )
+        # Desanexa da sessão da requisição antes de compartilhar entre requisições
+        db.expunge(user)
+        user_cache.set(user)
 
-    # Adicionar o ID do usuário ao request state para logging
+    # Adicionar o ID do usuário ao request state e ao contexto de logging
     request.state.user_id = user.id
+    user_id_var.set(user.id)
 
     return user
+
+async def get_current_admin(current_user: User = Depends(get_current_user)) -> User:
+    if (current_user.email or "").lower() not in ADMIN_EMAILS:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Acesso restrito a administradores",
+        )
+    return current_user
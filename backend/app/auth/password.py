@@ -0,0 +1,118 @@
+import asyncio
+import logging
+import math
+import os
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+import bcrypt
+from dotenv import load_dotenv
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# bcrypt libera o GIL, então um worker por núcleo aproveita toda a CPU
+BCRYPT_WORKERS = int(os.getenv("BCRYPT_WORKERS", os.cpu_count() or 1))
+# Quantas operações podem aguardar na fila além das que estão executando
+BCRYPT_MAX_QUEUE = int(os.getenv("BCRYPT_MAX_QUEUE", BCRYPT_WORKERS * 4))
+# Tempo alvo de um hash; o custo é calibrado no startup para ficar próximo dele
+BCRYPT_TARGET_MS = float(os.getenv("BCRYPT_TARGET_MS", "250"))
+# 12 era o custo fixo anterior à calibração: nunca gerar hashes mais fracos
+BCRYPT_MIN_ROUNDS = int(os.getenv("BCRYPT_MIN_ROUNDS", "12"))
+BCRYPT_MAX_ROUNDS = int(os.getenv("BCRYPT_MAX_ROUNDS", "15"))
+# Custo fixo (desativa a calibração). Recomendado em produção: todos os
+# workers e réplicas usam o mesmo custo, independente de ruído na medição
+BCRYPT_ROUNDS = os.getenv("BCRYPT_ROUNDS")
+# Medições da calibração (usa a mediana) e o custo barato usado nelas
+BCRYPT_CALIBRATION_SAMPLES = int(os.getenv("BCRYPT_CALIBRATION_SAMPLES", "5"))
+_CALIBRATION_ROUNDS = 8
+_BCRYPT_HIGHEST_ROUNDS = 31
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+_executor = ThreadPoolExecutor(max_workers=BCRYPT_WORKERS, thread_name_prefix="bcrypt")
+# Operações enviadas ao executor e ainda não concluídas. Só é alterado no
+# event loop, então não precisa de lock.
+_in_flight = 0
+
+
+def _use_rounds(rounds: int) -> None:
+    # Hashes com custo menor são regravados no próximo login, mas um custo
+    # maior (ex.: de outro worker ou de antes) nunca é rebaixado. Sem
+    # max_rounds explícito o passlib usaria o próprio custo como máximo.
+    pwd_context.update(
+        bcrypt__rounds=rounds,
+        bcrypt__min_rounds=rounds,
+        bcrypt__max_rounds=_BCRYPT_HIGHEST_ROUNDS,
+    )
+
+
+def _measure_ms(rounds: int) -> float:
+    start = time.perf_counter()
+    bcrypt.hashpw(b"calibracao", bcrypt.gensalt(rounds))
+    return (time.perf_counter() - start) * 1000
+
+
+def calibrate_rounds() -> int:
+    """Mede o custo de um hash barato e escolhe o maior custo que cabe em BCRYPT_TARGET_MS"""
+    if BCRYPT_ROUNDS:
+        rounds = int(BCRYPT_ROUNDS)
+    else:
+        # Mediana de várias medições: uma só varia demais com a carga da máquina
+        elapsed_ms = statistics.median(
+            _measure_ms(_CALIBRATION_ROUNDS) for _ in range(max(BCRYPT_CALIBRATION_SAMPLES, 1))
+        )
+        # Cada round a mais dobra o tempo do hash
+        extra = math.floor(math.log2(BCRYPT_TARGET_MS / max(elapsed_ms, 0.001)))
+        rounds = max(BCRYPT_MIN_ROUNDS, min(BCRYPT_MAX_ROUNDS, _CALIBRATION_ROUNDS + extra))
+        logger.warning(
+            "BCRYPT_ROUNDS não definido; bcrypt calibrado: %d rounds "
+            "(mediana de %.1f ms com %d rounds, alvo %.0f ms)",
+            rounds, elapsed_ms, _CALIBRATION_ROUNDS, BCRYPT_TARGET_MS,
+        )
+    _use_rounds(rounds)
+    return rounds
+
+
+async def calibrate() -> int:
+    return await asyncio.get_running_loop().run_in_executor(_executor, calibrate_rounds)
+
+
+def shutdown() -> None:
+    _executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def _run(fn, *args):
+    global _in_flight
+    if _in_flight >= BCRYPT_WORKERS + BCRYPT_MAX_QUEUE:
+        # Melhor recusar rápido do que acumular logins esperando por CPU
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Servidor ocupado, tente novamente em instantes",
+            headers={"Retry-After": "1"},
+        )
+    _in_flight += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_executor, fn, *args)
+    finally:
+        _in_flight -= 1
+
+
+def stats() -> dict:
+    return {"in_flight": _in_flight, "workers": BCRYPT_WORKERS, "max_queue": BCRYPT_MAX_QUEUE}
+
+
+async def hash_password(password: str) -> str:
+    return await _run(pwd_context.hash, password)
+
+
+async def verify_password(password: str, hashed: Optional[str]) -> Tuple[bool, Optional[str]]:
+    """Verifica a senha; se o hash usa outro custo, devolve também o novo hash"""
+    if not hashed:
+        return False, None
+    return await _run(pwd_context.verify_and_update, password, hashed)
@@ -0,0 +1,169 @@
+"""Armazenamento dos refresh tokens.
+
+O banco só guarda o sha256 do token. A rotação (apagar o token usado e
+gravar o novo) é um único statement, e os expirados são removidos por uma
+tarefa periódica em vez de a cada login. REFRESH_TOKEN_STORE=memory troca o
+banco por um dicionário em memória (testes, desenvolvimento local).
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import secrets
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+from dotenv import load_dotenv
+from sqlalchemy import delete, insert, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import AsyncSessionLocal
+from app.models.models import RefreshToken
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "7"))
+REFRESH_TOKEN_STORE = os.getenv("REFRESH_TOKEN_STORE", "sql").lower()
+# Intervalo da limpeza dos tokens expirados, em segundos
+REFRESH_TOKEN_SWEEP_INTERVAL = float(os.getenv("REFRESH_TOKEN_SWEEP_INTERVAL", "3600"))
+
+Issued = Tuple[str, datetime]
+
+
+def hash_token(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def _new_token() -> Issued:
+    return (
+        secrets.token_urlsafe(32),
+        datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+    )
+
+
+class SqlRefreshTokenStore:
+    """Tokens na tabela refresh_tokens. Não faz commit: fica a cargo de quem chama"""
+
+    async def issue(self, db: AsyncSession, user_id: int) -> Issued:
+        token, expires_at = _new_token()
+        await db.execute(insert(RefreshToken).values(
+            token_hash=hash_token(token),
+            user_id=user_id,
+            expires_at=expires_at,
+            created_at=datetime.utcnow(),
+        ))
+        return token, expires_at
+
+    async def rotate(self, db: AsyncSession, token: str) -> Optional[Tuple[int, str, datetime]]:
+        """Troca um token válido por um novo; devolve (user_id, novo token, expiração)"""
+        new_token, expires_at = _new_token()
+        now = datetime.utcnow()
+
+        # WITH used AS (DELETE ... RETURNING user_id) INSERT ... SELECT FROM used:
+        # se o token não existe ou expirou, nada é apagado nem inserido
+        used = (
+            delete(RefreshToken)
+            .where(RefreshToken.token_hash == hash_token(token), RefreshToken.expires_at > now)
+            .returning(RefreshToken.user_id)
+            .cte("used")
+        )
+        stmt = (
+            insert(RefreshToken)
+            .from_select(
+                ["token_hash", "user_id", "expires_at", "created_at"],
+                select(
+                    literal(hash_token(new_token)),
+                    used.c.user_id,
+                    literal(expires_at),
+                    literal(now),
+                ),
+            )
+            .returning(RefreshToken.user_id)
+        )
+        user_id = await db.scalar(stmt)
+        if user_id is None:
+            return None
+        return user_id, new_token, expires_at
+
+    async def revoke(self, db: AsyncSession, token: str) -> None:
+        await db.execute(delete(RefreshToken).where(RefreshToken.token_hash == hash_token(token)))
+
+    async def sweep(self) -> int:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                delete(RefreshToken).where(RefreshToken.expires_at < datetime.utcnow())
+            )
+            await db.commit()
+            return result.rowcount
+
+
+class MemoryRefreshTokenStore:
+    """Tokens em um dicionário do processo; perdidos no restart"""
+
+    def __init__(self):
+        self._tokens: Dict[str, Tuple[int, datetime]] = {}
+
+    async def issue(self, db: Optional[AsyncSession], user_id: int) -> Issued:
+        token, expires_at = _new_token()
+        self._tokens[hash_token(token)] = (user_id, expires_at)
+        return token, expires_at
+
+    async def rotate(self, db: Optional[AsyncSession], token: str) -> Optional[Tuple[int, str, datetime]]:
+        entry = self._tokens.pop(hash_token(token), None)
+        if entry is None or entry[1] <= datetime.utcnow():
+            return None
+        new_token, expires_at = await self.issue(db, entry[0])
+        return entry[0], new_token, expires_at
+
+    async def revoke(self, db: Optional[AsyncSession], token: str) -> None:
+        self._tokens.pop(hash_token(token), None)
+
+    async def sweep(self) -> int:
+        now = datetime.utcnow()
+        expired = [key for key, (_, expires_at) in self._tokens.items() if expires_at < now]
+        for key in expired:
+            del self._tokens[key]
+        return len(expired)
+
+
+def _store_from_env():
+    if REFRESH_TOKEN_STORE == "memory":
+        return MemoryRefreshTokenStore()
+    if REFRESH_TOKEN_STORE != "sql":
+        raise RuntimeError(f"REFRESH_TOKEN_STORE inválido: {REFRESH_TOKEN_STORE}")
+    return SqlRefreshTokenStore()
+
+
+refresh_token_store = _store_from_env()
+
+_sweeper: Optional[asyncio.Task] = None
+
+
+async def _sweep_forever(interval: float) -> None:
+    while True:
+        try:
+            removed = await refresh_token_store.sweep()
+            if removed:
+                logger.info("Refresh tokens expirados removidos: %d", removed)
+        except Exception:
+            logger.exception("Erro na limpeza de refresh tokens expirados")
+        await asyncio.sleep(interval)
+
+
+def start_sweeper(interval: float = REFRESH_TOKEN_SWEEP_INTERVAL) -> None:
+    global _sweeper
+    if _sweeper is None and interval > 0:
+        _sweeper = asyncio.create_task(_sweep_forever(interval), name="refresh-token-sweeper")
+
+
+async def stop_sweeper() -> None:
+    global _sweeper
+    if _sweeper is not None:
+        _sweeper.cancel()
+        try:
+            await _sweeper
+        except asyncio.CancelledError:
+            pass
+        _sweeper = None
@@ -1,12 +1,14 @@
 
 from jose import JWTError, jwt, ExpiredSignatureError
+from cachetools import TLRUCache
+from collections import Counter
+import hashlib
 import os
+import threading
 from dotenv import load_dotenv
 import time
 import logging
 
-# Configurar logging básico
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 load_dotenv()
@@ -17,25 +19,58 @@ if not SECRET_KEY:
 
 ALGORITHM = "HS256"
 
+TOKEN_CACHE_MAXSIZE = int(os.getenv("TOKEN_CACHE_MAXSIZE", "10000"))
+# Cada tipo de ocorrência é logado na 1ª vez e depois a cada N vezes
+TOKEN_LOG_SAMPLE_EVERY = max(int(os.getenv("TOKEN_LOG_SAMPLE_EVERY", "1000")), 1)
+
+
+def _expires_at(key, payload, now):
+    # A entrada vale até o exp do próprio token; sem exp, não é cacheada
+    return payload.get("exp", now)
+
+
+# Payloads já verificados, indexados pelo hash do token
+_cache = TLRUCache(maxsize=TOKEN_CACHE_MAXSIZE, ttu=_expires_at, timer=time.time)
+_lock = threading.Lock()
+_counters = Counter()
+
+
+def _record(kind: str, level: int = logging.DEBUG) -> None:
+    with _lock:
+        _counters[kind] += 1
+        count = _counters[kind]
+    if (count - 1) % TOKEN_LOG_SAMPLE_EVERY == 0:
+        logger.log(level, "Token %s (total: %d)", kind, count)
+
+
+def token_stats() -> dict:
+    with _lock:
+        return {"cache_size": len(_cache), **_counters}
+
+
 def verify_token(token: str):
+    key = hashlib.sha256(token.encode()).digest()
+    with _lock:
+        payload = _cache.get(key)
+    if payload is not None:
+        _record("cache_hit")
+        return payload
+
     try:
-        # Registrar tentativa de decodificação sem expor o token completo
-        token_prefix = token[:8] if len(token) > 8 else "[token muito curto]"
-        logger.info(f"Verificando token: {token_prefix}...")
-        
         # Decodificar o token
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        
+        _record("decoded")
+
         # Verificar se o token está prestes a expirar (5 minutos ou menos)
-        if "exp" in payload:
-            remaining = payload["exp"] - time.time()
-            if remaining <= 300:  # 5 minutos
-                logger.warning(f"Token expirará em {int(remaining)} segundos")
-                
+        if "exp" in payload and payload["exp"] - time.time() <= 300:
+            _record("expiring_soon")
+
+        with _lock:
+            _cache[key] = payload
         return payload
     except ExpiredSignatureError:
-        logger.warning("Token expirado")
+        _record("expired", logging.WARNING)
         return None
-    except JWTError as e:
-        logger.error(f"Erro na validação do token: {str(e)}")
+    except JWTError:
+        _record("invalid", logging.WARNING)
         return None
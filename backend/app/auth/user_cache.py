@@ -0,0 +1,76 @@
+import os
+import threading
+from typing import Optional
+
+from cachetools import TTLCache
+from dotenv import load_dotenv
+from sqlalchemy import event
+
+from app.models.models import User
+
+load_dotenv()
+
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+USER_CACHE_MAXSIZE = int(os.getenv("USER_CACHE_MAXSIZE", "10000"))
+
+
+class UserCache:
+    """Cache em processo dos usuários ativos autenticados, por id.
+
+    Entradas expiram após o TTL e, com o cache cheio, as menos usadas são
+    descartadas primeiro (TTLCache é um LRU com expiração). Os objetos
+    guardados estão desanexados da sessão e são apenas para leitura.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        # As alterações de User podem vir de sessões síncronas (threadpool)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, user_id: int) -> Optional[User]:
+        with self._lock:
+            user = self._cache.get(user_id)
+            if user is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return user
+
+    def set(self, user: User) -> None:
+        with self._lock:
+            self._cache[user.id] = user
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            if self._cache.pop(user_id, None) is not None:
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._cache),
+                "maxsize": self._cache.maxsize,
+                "ttl_seconds": self._cache.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+            }
+
+
+user_cache = UserCache(maxsize=USER_CACHE_MAXSIZE, ttl=USER_CACHE_TTL_SECONDS)
+
+
+# Qualquer UPDATE/DELETE de User feito pelo ORM (desativação, troca de
+# senha, etc.) invalida a entrada. Updates em massa via query.update()
+# não disparam esses eventos e devem chamar user_cache.invalidate().
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_user(mapper, connection, target):
+    user_cache.invalidate(target.id)
@@ -1,29 +1,128 @@
 from sqlalchemy import create_engine
 from sqlalchemy.orm import declarative_base, sessionmaker, Session
-from sqlalchemy import event
-from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from dotenv import load_dotenv
+import asyncio
+import logging
 import os
+import threading
+import time
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 DB_USER = os.getenv("DB_USER")
 DB_PASS = os.getenv("DB_PASS") or os.getenv("DB_PASSWORD")
 DB_HOST = os.getenv("DB_HOST")
 DB_PORT = os.getenv("DB_PORT")
 DB_NAME = os.getenv("DB_NAME")
+# "require" no banco gerenciado; "disable" para um PostgreSQL local sem TLS
+DB_SSLMODE = os.getenv("DB_SSLMODE", "require")
+
+# Pool de conexões
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+# Conexões abertas no startup (limitado a DB_POOL_SIZE)
+DB_POOL_PREWARM = int(os.getenv("DB_POOL_PREWARM", str(DB_POOL_SIZE)))
+# Timeout por statement das requisições da API, em ms (0 = sem limite)
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+
+DATABASE_URL = f"postgresql+psycopg2://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}?sslmode={DB_SSLMODE}"
+# Mesmo banco via psycopg 3, usado pelos routers async
+ASYNC_DATABASE_URL = f"postgresql+psycopg://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}?sslmode={DB_SSLMODE}"
+
+
+class PoolWaitStats:
+    """Tempo que as requisições esperaram por uma conexão livre no pool"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self.count += 1
+            self.total_seconds += seconds
+            if seconds > self.max_seconds:
+                self.max_seconds = seconds
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.count,
+                "total_seconds": round(self.total_seconds, 6),
+                "avg_seconds": round(self.total_seconds / self.count, 6) if self.count else 0.0,
+                "max_seconds": round(self.max_seconds, 6),
+            }
+
+
+class _TimedPoolMixin:
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_stats = PoolWaitStats()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            self.wait_stats.observe(time.perf_counter() - start)
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    pass
+
 
-DATABASE_URL = f"postgresql+psycopg2://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}?sslmode=require"
+class TimedAsyncQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
 
-engine = create_engine(DATABASE_URL)
 
-@event.listens_for(engine, "before_cursor_execute")
-def receive_before_cursor_execute(conn, cursor, statement, params, execution_context, executemany):
-    if conn.dialect.name == 'postgresql':
-        cursor.execute("SET NAMES 'UTF8'")
+def _connect_options(statement_timeout_ms: int = 0) -> dict:
+    # Enviado no pacote de startup da conexão: a codificação (e o timeout)
+    # ficam definidos uma vez por conexão, sem round-trip extra por query
+    options = "-c client_encoding=UTF8"
+    if statement_timeout_ms:
+        options += f" -c statement_timeout={statement_timeout_ms}"
+    return {"options": options}
+
+
+_pool_kwargs = dict(
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING,
+)
+
+# Engine síncrona: Alembic e scripts. Sem statement_timeout para não
+# interromper migrations longas (ex.: CREATE INDEX CONCURRENTLY).
+engine = create_engine(
+    DATABASE_URL,
+    poolclass=TimedQueuePool,
+    connect_args=_connect_options(),
+    **_pool_kwargs,
+)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    poolclass=TimedAsyncQueuePool,
+    connect_args=_connect_options(DB_STATEMENT_TIMEOUT_MS),
+    **_pool_kwargs,
+)
+
+# expire_on_commit=False: os objetos continuam legíveis após o commit sem
+# disparar um novo SELECT implícito (que não é permitido fora de await)
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
 def get_db():
@@ -31,4 +130,45 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def pool_stats(pool=None) -> dict:
+    """Estado atual do pool da engine async"""
+    pool = pool or async_engine.pool
+    stats = {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        # overflow() começa em -pool_size e só fica positivo além do pool base
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": DB_MAX_OVERFLOW,
+    }
+    wait_stats = getattr(pool, "wait_stats", None)
+    if wait_stats is not None:
+        stats["wait"] = wait_stats.snapshot()
+    return stats
+
+
+async def prewarm_pool(connections: int = DB_POOL_PREWARM) -> int:
+    """Abre conexões no startup para a primeira onda de requisições não pagar o handshake TLS"""
+    connections = min(connections, DB_POOL_SIZE)
+    if connections <= 0:
+        return 0
+
+    results = await asyncio.gather(
+        *(async_engine.connect().start() for _ in range(connections)),
+        return_exceptions=True,
+    )
+    opened = [conn for conn in results if not isinstance(conn, BaseException)]
+    for conn in opened:
+        await conn.close()
+
+    failures = len(results) - len(opened)
+    if failures:
+        logger.warning("Pre-warm do pool: %d de %d conexões falharam", failures, connections)
+    return len(opened)
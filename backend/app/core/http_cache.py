@@ -0,0 +1,41 @@
+import hashlib
+from typing import Any
+
+from fastapi import Request, Response, status
+
+# O navegador guarda a resposta, mas sempre revalida com If-None-Match
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(user_id: int, version: int, *parts: Any) -> str:
+    """ETag fraco a partir do dono dos dados, da versão e dos parâmetros da consulta.
+
+    O usuário entra na chave: dois usuários com a mesma versão não podem
+    receber o mesmo ETag (e um 304 com o corpo em cache do outro).
+    """
+    key = hashlib.sha1(repr((user_id, *parts)).encode()).hexdigest()[:16]
+    return f'W/"{version}-{key}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # Comparação fraca: ignora o prefixo W/
+    tags = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag.removeprefix("W/") in tags
+
+
+def set_cache_headers(response: Response, etag: str) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    # A mesma URL tem conteúdo diferente para cada token
+    response.headers["Vary"] = "Authorization"
+
+
+def not_modified(etag: str) -> Response:
+    response = Response(status_code=status.HTTP_304_NOT_MODIFIED)
+    set_cache_headers(response, etag)
+    return response
@@ -0,0 +1,169 @@
+"""Métricas da API no formato texto do Prometheus (GET /metrics).
+
+MetricsMiddleware registra, por método, template da rota e status, um
+histograma de latência (o _count do histograma é a contagem de
+requisições) e mantém o número de requisições em andamento. O restante
+(threadpool do anyio, pool do banco, caches, leads) é lido só quando
+/metrics é consultado.
+
+Tudo roda no event loop, então os contadores não precisam de lock. Com
+vários workers do uvicorn cada processo tem as suas métricas.
+
+/metrics fica no mesmo host público da API, então é fechado por padrão
+(404). Com METRICS_TOKEN definido, exige "Authorization: Bearer
+<METRICS_TOKEN>". METRICS_PUBLIC=true serve sem token, só para
+desenvolvimento ou quando a porta não é exposta à internet.
+"""
+import os
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Tuple
+
+import anyio.to_thread
+
+# Limites superiores dos buckets de latência, em segundos
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Se definido, /metrics exige "Authorization: Bearer <METRICS_TOKEN>"
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+# Sem token, /metrics só responde com este opt-in explícito
+METRICS_PUBLIC = os.getenv("METRICS_PUBLIC", "false").lower() in ("1", "true", "yes")
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Requisições que não casaram com nenhuma rota (404 de varredura, etc.)
+# ficam em um único rótulo para não multiplicar as séries
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class _Histogram:
+    __slots__ = ("buckets", "sum", "count")
+
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float) -> None:
+        self.buckets[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+
+class Metrics:
+    def __init__(self):
+        self.requests: Dict[Tuple[str, str, int], _Histogram] = {}
+        self.in_flight = 0
+        # Fontes extras lidas a cada coleta: nome -> função que devolve um dict
+        self.collectors: Dict[str, Callable[[], dict]] = {}
+
+    def observe(self, method: str, route: str, status: int, seconds: float) -> None:
+        key = (method, route, status)
+        histogram = self.requests.get(key)
+        if histogram is None:
+            histogram = self.requests[key] = _Histogram()
+        histogram.observe(seconds)
+
+    def register(self, name: str, collector: Callable[[], dict]) -> None:
+        self.collectors[name] = collector
+
+    def render(self) -> str:
+        lines: List[str] = [
+            "# HELP http_request_duration_seconds Latência das requisições por rota e status",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for (method, route, status), histogram in sorted(self.requests.items()):
+            labels = f'method="{method}",route="{_escape(route)}",status="{status}"'
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS, histogram.buckets):
+                cumulative += count
+                lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {histogram.count}')
+            lines.append(f"http_request_duration_seconds_sum{{{labels}}} {histogram.sum:.6f}")
+            lines.append(f"http_request_duration_seconds_count{{{labels}}} {histogram.count}")
+
+        lines += [
+            "# HELP http_requests_in_flight Requisições em andamento",
+            "# TYPE http_requests_in_flight gauge",
+            f"http_requests_in_flight {self.in_flight}",
+        ]
+        lines += _threadpool_lines()
+        for name, collector in self.collectors.items():
+            lines += _dict_lines(name, collector())
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _threadpool_lines() -> List[str]:
+    # Limitador usado por run_in_threadpool e pelas dependências/rotas síncronas
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    statistics = limiter.statistics()
+    return [
+        "# HELP threadpool_threads_busy Threads do anyio executando tarefas",
+        "# TYPE threadpool_threads_busy gauge",
+        f"threadpool_threads_busy {statistics.borrowed_tokens}",
+        "# HELP threadpool_threads_limit Limite de threads do anyio",
+        "# TYPE threadpool_threads_limit gauge",
+        f"threadpool_threads_limit {statistics.total_tokens}",
+        "# HELP threadpool_queue_depth Tarefas esperando uma thread livre",
+        "# TYPE threadpool_queue_depth gauge",
+        f"threadpool_queue_depth {statistics.tasks_waiting}",
+    ]
+
+
+def _dict_lines(prefix: str, values: dict) -> List[str]:
+    """Valores numéricos de um dict de estatísticas (aninhados com _)"""
+    lines = []
+    for key, value in values.items():
+        name = f"{prefix}_{key}"
+        if isinstance(value, dict):
+            lines += _dict_lines(name, value)
+        elif isinstance(value, (bool, int, float)):
+            lines.append(f"# TYPE {name} untyped")
+            lines.append(f"{name} {int(value) if isinstance(value, bool) else value}")
+    return lines
+
+
+metrics = Metrics()
+
+
+class MetricsMiddleware:
+    """Middleware ASGI que mede cada requisição HTTP.
+
+    O template da rota (ex.: /api/events/{event_id}) só é conhecido depois
+    do roteamento, então é lido do scope ao final da requisição.
+    """
+
+    def __init__(self, app, registry: Metrics = metrics):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        self.registry.in_flight += 1
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            self.registry.in_flight -= 1
+            route = scope.get("route")
+            self.registry.observe(
+                scope["method"],
+                route.path if route is not None else UNMATCHED_ROUTE,
+                status_code,
+                time.perf_counter() - start,
+            )
@@ -0,0 +1,105 @@
+import logging
+import time
+import uuid
+
+from app.core.logging_config import request_id_var
+
+access_logger = logging.getLogger("app.access")
+
+CONTENT_SECURITY_POLICY = (
+    "default-src 'self'; "
+    "connect-src 'self'; "
+    "img-src 'self' data: https://fastapi.tiangolo.com; "
+    "script-src 'self' 'unsafe-inline' https://cdn.jsdelivr.net; "
+    "style-src 'self' 'unsafe-inline' https://cdn.jsdelivr.net;"
+)
+
+# Calculados uma única vez, já no formato de headers ASGI (nome minúsculo, bytes)
+SECURITY_HEADERS = [
+    (b"x-content-type-options", b"nosniff"),
+    (b"x-frame-options", b"DENY"),
+    (b"content-security-policy", CONTENT_SECURITY_POLICY.encode("latin-1")),
+    (b"strict-transport-security", b"max-age=31536000; includeSubDomains"),
+    (b"referrer-policy", b"strict-origin-when-cross-origin"),
+]
+
+
+class SecurityHeadersMiddleware:
+    """Middleware ASGI que adiciona os headers de segurança a toda resposta.
+
+    Só intercepta a mensagem http.response.start; o corpo passa direto,
+    o que preserva StreamingResponse e não cria tasks extras por requisição.
+    """
+
+    def __init__(self, app, headers=SECURITY_HEADERS):
+        self.app = app
+        self.headers = list(headers)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [*self.headers, *message.get("headers", [])]
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+
+class RequestContextMiddleware:
+    """Middleware ASGI que identifica a requisição e registra o log de acesso.
+
+    Usa o X-Request-ID recebido (ou gera um), devolve-o na resposta e o
+    deixa disponível para todos os logs emitidos durante a requisição.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")[:128]
+                break
+        request_id = request_id or uuid.uuid4().hex
+        token = request_id_var.set(request_id)
+
+        status_code = 500
+
+        async def send_with_request_id(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"x-request-id", request_id.encode("latin-1")),
+                ]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            # O template da rota (ex.: /api/events/{event_id}) só existe após o roteamento
+            route = scope.get("route")
+            access_logger.info(
+                "%s %s %d",
+                scope["method"],
+                scope["path"],
+                status_code,
+                extra={
+                    "method": scope["method"],
+                    "route": route.path if route is not None else scope["path"],
+                    "status": status_code,
+                    "duration_ms": round((time.perf_counter() - start) * 1000, 2),
+                    "user_id": scope.get("state", {}).get("user_id"),
+                },
+            )
+            request_id_var.reset(token)
@@ -0,0 +1,38 @@
+import base64
+import json
+from datetime import date, datetime
+from typing import Any, List, Optional
+
+from fastapi import HTTPException, status
+
+# Header usado para devolver o cursor da próxima página sem alterar o corpo da resposta
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(*values: Any) -> str:
+    """Serializa a chave de ordenação do último item em um cursor opaco"""
+    raw = json.dumps(
+        [v.isoformat() if isinstance(v, date) else v for v in values],
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str], *types: type) -> Optional[List[Any]]:
+    """Decodifica um cursor gerado por encode_cursor convertendo cada valor para o tipo esperado"""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError("cursor com formato inesperado")
+        return [
+            t.fromisoformat(v) if t in (date, datetime) else t(v)
+            for v, t in zip(values, types)
+        ]
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor inválido"
+        )
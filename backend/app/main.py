@@ -1,18 +1,56 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, HTTPException, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
-from sqlalchemy.orm import Session
-from app.routers import users, events
-from app.core.database import Base, engine, get_db
-from app.models.models import User, Event
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.routers import users, events, leads
+from app.auth import password, refresh_tokens
+from app.auth.token_utils import token_stats
+from app.auth.user_cache import user_cache
+from app.core.database import async_engine, get_async_db, pool_stats, prewarm_pool
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.logging_config import bind_route, setup_logging, shutdown_logging
+from app.core.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, METRICS_PUBLIC, METRICS_TOKEN, MetricsMiddleware, metrics
+from app.core.middleware import RequestContextMiddleware, SecurityHeadersMiddleware
+from app.services.lead_buffer import LEADS_WRITE_BEHIND, lead_buffer
+from app.services.lead_forwarder import lead_forwarder
+import logging
 import os
+import secrets
 from dotenv import load_dotenv
 
 load_dotenv()
 
-app = FastAPI()
+setup_logging()
+logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Calibra o custo do bcrypt para o hardware atual antes de aceitar logins
+    await password.calibrate()
+    await prewarm_pool()
+    await lead_forwarder.start()
+    refresh_tokens.start_sweeper()
+    if LEADS_WRITE_BEHIND:
+        await lead_buffer.start()
+    yield
+    await refresh_tokens.stop_sweeper()
+    # O buffer grava no banco: precisa ser esvaziado antes do dispose da engine
+    await lead_buffer.stop()
+    # Antes de fechar o resto: tenta entregar os leads que ainda estão na fila
+    await lead_forwarder.stop()
+    password.shutdown()
+    await async_engine.dispose()
+    shutdown_logging()
+
+# ORJSONResponse: respostas serializadas com orjson em vez do json da stdlib
+app = FastAPI(
+    lifespan=lifespan,
+    dependencies=[Depends(bind_route)],
+    default_response_class=ORJSONResponse,
+)
 
 # Configura CORS
 origins = [
@@ -33,7 +71,9 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
-    expose_headers=["*"],
+    # Com allow_credentials o navegador trata "*" como nome literal de
+    # header; os headers lidos pelo frontend precisam ser listados
+    expose_headers=[NEXT_CURSOR_HEADER, events.BOOKING_CONFLICTS_HEADER, "ETag", "X-Request-ID"],
 )
 
 # Configura Trusted Hosts
@@ -46,31 +86,29 @@ ALLOWED_HOSTS = [
 app.add_middleware(TrustedHostMiddleware, allowed_hosts=ALLOWED_HOSTS)
 
 # Security headers middleware
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        response = await call_next(request)
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        response.headers["X-Frame-Options"] = "DENY"
-        response.headers["Content-Security-Policy"] = (
-    "default-src 'self'; "
-    "connect-src 'self'; "
-    "img-src 'self' data: https://fastapi.tiangolo.com; "
-    "script-src 'self' 'unsafe-inline' https://cdn.jsdelivr.net; "
-    "style-src 'self' 'unsafe-inline' https://cdn.jsdelivr.net;"
-)
-        response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
-        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-        return response
-
 app.add_middleware(SecurityHeadersMiddleware)
 
-# Cria tabelas no banco se não existirem
-Base.metadata.create_all(bind=engine)
+# Latência por rota e requisições em andamento (GET /metrics)
+app.add_middleware(MetricsMiddleware)
+
+# Estatísticas já mantidas pelos módulos, lidas a cada coleta de /metrics
+metrics.register("db_pool", pool_stats)
+metrics.register("bcrypt", password.stats)
+metrics.register("user_cache", user_cache.stats)
+metrics.register("token", token_stats)
+metrics.register("lead_buffer", lead_buffer.snapshot)
+metrics.register("lead_forwarder", lead_forwarder.stats)
+
+# Adicionado por último para ser o mais externo: cobre também as respostas
+# geradas pelos outros middlewares
+app.add_middleware(RequestContextMiddleware)
+
+# O schema do banco é gerenciado pelas migrations (alembic upgrade head)
 
 # Handler global de erros
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
-    print(f"Erro global capturado: {exc}")
+    logger.exception("Erro global capturado", exc_info=exc)
     return JSONResponse(
         status_code=500,
         content={"detail": "Internal server error"}
@@ -79,17 +117,37 @@ async def global_exception_handler(request: Request, exc: Exception):
 # Rotas
 app.include_router(users.router, prefix="/api")
 app.include_router(events.router, prefix="/api")
+# Só POST /leads/ e /leads/googlesheet são públicos; a leitura exige admin
+app.include_router(leads.router, prefix="/api")
+app.include_router(leads.admin_router, prefix="/api")
 
 # Health check
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
 
-# Teste de conexão
-@app.get("/test-db")
-def test_db(db: Session = Depends(get_db)):
+# Readiness: banco acessível e estado do pool de conexões
+@app.get("/ready")
+async def readiness_check(db: AsyncSession = Depends(get_async_db)):
     try:
-        db.execute("SELECT 1")
-        return {"status": "Conexão com banco funcionando! 🎉"}
-    except Exception as e:
-        return {"status": "Erro na conexão com o banco", "detail": str(e)}
+        await db.execute(text("SELECT 1"))
+    except Exception:
+        logger.exception("Readiness check falhou")
+        return JSONResponse(
+            status_code=503,
+            content={"status": "unavailable", "pool": pool_stats()}
+        )
+    return {"status": "ready", "pool": pool_stats()}
+
+# Métricas no formato texto do Prometheus
+@app.get("/metrics", include_in_schema=False)
+async def metrics_endpoint(request: Request):
+    if not METRICS_TOKEN:
+        # Fechado por padrão: o host é público
+        if not METRICS_PUBLIC:
+            raise HTTPException(status_code=404, detail="Not Found")
+    elif not secrets.compare_digest(
+        request.headers.get("authorization", "").encode(), f"Bearer {METRICS_TOKEN}".encode()
+    ):
+        raise HTTPException(status_code=401, detail="Não autorizado")
+    return Response(content=metrics.render(), media_type=METRICS_CONTENT_TYPE)
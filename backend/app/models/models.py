@@ -1,45 +1,103 @@
 
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Float, func, Text, JSON
-from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy import Column, Integer, String, DateTime, Date, ForeignKey, Boolean, Float, Enum, Index, func, Text, JSON
 from sqlalchemy.orm import relationship
+from app.core.database import Base
+from app.schemas.schemas import EventStatus
 import datetime
 
-Base = declarative_base()
-
 class User(Base):
     __tablename__ = "users"
 
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String, unique=True, index=True)
     name = Column(String)
-    password = Column(String)
+    hashed_password = Column(String)
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    # Incrementado a cada alteração nos eventos do usuário; base dos ETags
+    events_version = Column(Integer, nullable=False, default=0, server_default="0")
     
     # Relacionamentos
     events = relationship("Event", back_populates="user")
+    refresh_tokens = relationship("RefreshToken", back_populates="user")
 
 class Event(Base):
     __tablename__ = "events"
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
-    title = Column(String, index=True)
-    description = Column(String)
-    start = Column(DateTime)
-    end = Column(DateTime)
-    location = Column(String)
-    status = Column(String, default="Pendente")  # Pendente, Confirmado, Cancelado
+    nomeCliente = Column(String, nullable=False)
+    tipoEvento = Column(String, nullable=False)
+    dataOrcamento = Column(Date, nullable=False)
+    dataEvento = Column(Date, nullable=False)
+    status = Column(Enum(EventStatus), default=EventStatus.orcamento_recebido, nullable=False)
+    valorEvento = Column(Float)
+    iraParcelar = Column(Boolean, default=False)
+    quantParcelas = Column(Integer)
+    dataPrimeiroPagamento = Column(Date)
+    contatoCliente = Column(String)
+    motivoRecusa = Column(String)
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
     
     # Relacionamentos
     user = relationship("User", back_populates="events")
 
+    __table_args__ = (
+        # Índices das consultas por usuário dos routers (ver migrations/versions)
+        Index("ix_events_user_id_id", "user_id", "id"),
+        Index("ix_events_user_status", "user_id", "status"),
+        # Chave da paginação por cursor de list_events; também atende filtros por (user_id, dataEvento)
+        Index("ix_events_user_dataevento_id", "user_id", "dataEvento", "id"),
+        # A busca usa ix_events_search_trgm (GIN de trigramas), criado só pela
+        # migration 0007: depende das extensões pg_trgm, unaccent e btree_gin
+    )
+
+class EventMonthlySummary(Base):
+    """Contagem e soma de valorEvento por usuário, mês do evento e status.
+
+    Mantida incrementalmente pelas escritas em events (ver
+    app/services/event_summary.py); scripts/rebuild_event_summary.py
+    recalcula a partir de events.
+    """
+    __tablename__ = "event_monthly_summary"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    year = Column(Integer, primary_key=True)
+    month = Column(Integer, primary_key=True)
+    status = Column(Enum(EventStatus), primary_key=True)
+    eventos = Column(Integer, nullable=False, default=0)
+    valor = Column(Float, nullable=False, default=0)
+
 class Lead(Base):
     __tablename__ = "leads"
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String)
-    email = Column(String)
+    email = Column(String, index=True)
     phone = Column(String)  # Campo adicionado para telefone
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
+
+    __table_args__ = (
+        # Paginação por cursor e filtro por período da listagem de leads
+        Index("ix_leads_created_at_id", "created_at", "id"),
+    )
+
+class RefreshToken(Base):
+    __tablename__ = "refresh_tokens"
+
+    id = Column(Integer, primary_key=True, index=True)
+    # sha256 do token em hex; o valor original só existe no cookie do cliente
+    token_hash = Column(String(64), unique=True, index=True, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+
+    # Relacionamentos
+    user = relationship("User", back_populates="refresh_tokens")
+
+    __table_args__ = (
+        Index("ix_refresh_tokens_user_expires", "user_id", "expires_at"),
+        # Limpeza periódica dos expirados (ver app/auth/refresh_tokens.py)
+        Index("ix_refresh_tokens_expires_at", "expires_at"),
+    )
+
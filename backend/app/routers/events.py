@@ -1,41 +1,385 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
-from sqlalchemy.orm import Session
-from app.core.database import get_db
-from app.models.models import Event, User
-from app.schemas.schemas import EventCreate, EventOut, EventUpdate
-from typing import List, Optional
+from fastapi import APIRouter, Depends, File, HTTPException, status, Query, Request, Response, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Integer, and_, case, cast, delete, extract, func, insert, or_, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_async_db
+from app.core.http_cache import etag_matches, make_etag, not_modified, set_cache_headers
+from app.core.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+from app.models.models import Event, EventMonthlySummary, User
+from app.schemas.schemas import CashFlowMonth, CashFlowProjection, EventAvailability, EventAvailabilityDay, EventAvailabilityRequest, EventBatchItemResult, EventBatchRequest, EventBatchResult, EventCreate, EventImportResult, EventOut, EventUpdate, EventStats, EventStatus, MonthlyEventStats
+from app.services import cash_flow, event_export, event_import
+from app.services.event_summary import SummaryDelta
+from typing import Dict, Iterable, List, Optional
+from pydantic import TypeAdapter
+import numpy as np
 from app.auth.auth_handler import get_current_user
 import logging
-from datetime import date
+from datetime import date, timedelta
 
 # Configurar logging
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-# Listar eventos com paginação
+# Valida e serializa a lista inteira direto em bytes JSON (pydantic-core),
+# sem a validação genérica do response_model seguida do encoder da resposta
+_event_list_adapter = TypeAdapter(List[EventOut])
+
+# Ids das propostas aceitas no mesmo dia do evento criado/atualizado
+BOOKING_CONFLICTS_HEADER = "X-Booking-Conflicts"
+
+# Maior intervalo aceito por /events/calendar
+CALENDAR_MAX_DAYS = 366
+
+async def _events_version(db: AsyncSession, user_id: int) -> int:
+    # Lido do banco a cada requisição: o User do cache pode estar desatualizado
+    return await db.scalar(select(User.events_version).where(User.id == user_id))
+
+async def _events_etag(db: AsyncSession, user_id: int, *parts) -> str:
+    return make_etag(user_id, await _events_version(db, user_id), *parts)
+
+async def _bump_events_version(db: AsyncSession, user_id: int) -> None:
+    # Na mesma transação da escrita: invalida os ETags das leituras de eventos
+    await db.execute(
+        update(User).where(User.id == user_id).values(events_version=User.events_version + 1)
+    )
+
+async def _events_changed(db: AsyncSession, user_id: int, delta: SummaryDelta) -> None:
+    """Efeitos colaterais de toda escrita em events, na mesma transação:
+    resumo mensal (event_monthly_summary) e versão usada nos ETags"""
+    await delta.apply(db, user_id)
+    await _bump_events_version(db, user_id)
+
+def _event_list_response(events, etag: str, next_cursor: Optional[str] = None) -> Response:
+    response = Response(
+        content=_event_list_adapter.dump_json(
+            _event_list_adapter.validate_python(events, from_attributes=True)
+        ),
+        media_type="application/json"
+    )
+    set_cache_headers(response, etag)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return response
+
+async def _booking_conflicts(
+    db: AsyncSession, user_id: int, dates: Iterable[date], exclude_id: Optional[int] = None
+) -> Dict[date, List[int]]:
+    """Propostas aceitas nas datas informadas, em uma consulta (ix_events_user_dataevento_id)"""
+    query = select(Event.dataEvento, Event.id).where(
+        Event.user_id == user_id,
+        Event.dataEvento.in_(set(dates)),
+        Event.status == EventStatus.proposta_aceita,
+    )
+    if exclude_id is not None:
+        query = query.where(Event.id != exclude_id)
+
+    conflicts: Dict[date, List[int]] = {}
+    for event_date, event_id in await db.execute(query.order_by(Event.dataEvento, Event.id)):
+        conflicts.setdefault(event_date, []).append(event_id)
+    return conflicts
+
+def _conflict_message(event_date: date, conflicts: List[int]) -> str:
+    return f"Já existe proposta aceita em {event_date.isoformat()} (eventos {', '.join(map(str, conflicts))})"
+
+async def _check_booking(
+    db: AsyncSession, user_id: int, event: Event, response: Response, reject: bool
+) -> None:
+    """Avisa (header X-Booking-Conflicts) ou recusa com 409 um evento marcado
+    em dia que já tem proposta aceita. Propostas recusadas não ocupam a data."""
+    if event.status == EventStatus.proposta_recusada:
+        return
+    conflicts = (await _booking_conflicts(db, user_id, [event.dataEvento], event.id)).get(event.dataEvento)
+    if not conflicts:
+        return
+    if reject:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=_conflict_message(event.dataEvento, conflicts)
+        )
+    response.headers[BOOKING_CONFLICTS_HEADER] = ",".join(map(str, conflicts))
+
+# Listar eventos com paginação por cursor (ordenados por dataEvento, id)
 @router.get("/events/", response_model=List[EventOut])
-def list_events(
+async def list_events(
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
-    skip: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None),
     limit: int = Query(100, ge=1, le=100)
 ):
-    logger.info(f"User {current_user.id} requested events. Skip: {skip}, Limit: {limit}")
+    logger.debug("User %s requested events. Cursor: %s, Limit: %s", current_user.id, cursor, limit)
 
-    events = db.query(Event).filter(
-        Event.user_id == current_user.id
-    ).offset(skip).limit(limit).all()
+    # Se nada mudou desde a última leitura, responde 304 sem consultar events
+    etag = await _events_etag(db, current_user.id, "list", cursor, limit)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    query = select(Event).where(Event.user_id == current_user.id)
+
+    after = decode_cursor(cursor, date, int)
+    if after:
+        query = query.where(tuple_(Event.dataEvento, Event.id) > tuple_(*after))
+
+    # Busca um item a mais para saber se existe próxima página
+    result = await db.execute(query.order_by(Event.dataEvento, Event.id).limit(limit + 1))
+    events = result.scalars().all()
+
+    next_cursor = None
+    if len(events) > limit:
+        events = events[:limit]
+        last = events[-1]
+        next_cursor = encode_cursor(last.dataEvento, last.id)
+
+    return _event_list_response(events, etag, next_cursor)
+
+def _stats_filters(user_id: int, year: Optional[int], date_from: Optional[date], date_to: Optional[date]):
+    filters = [Event.user_id == user_id]
+    if year is not None:
+        # Intervalo fechado em vez de extract() para aproveitar índices em dataEvento
+        filters.append(Event.dataEvento.between(date(year, 1, 1), date(year, 12, 31)))
+    if date_from is not None:
+        filters.append(Event.dataEvento >= date_from)
+    if date_to is not None:
+        filters.append(Event.dataEvento <= date_to)
+    return filters
+
+def _month_period(year: Optional[int], date_from: Optional[date], date_to: Optional[date]):
+    """Intervalo em índices de mês (ano * 12 + mês - 1) se os filtros cobrem
+    meses inteiros; None se algum limite cai no meio de um mês"""
+    first, last = None, None
+    if year is not None:
+        first, last = year * 12, year * 12 + 11
+    if date_from is not None:
+        if date_from.day != 1:
+            return None
+        start = date_from.year * 12 + date_from.month - 1
+        first = start if first is None else max(first, start)
+    if date_to is not None:
+        if (date_to + timedelta(days=1)).day != 1:
+            return None
+        end = date_to.year * 12 + date_to.month - 1
+        last = end if last is None else min(last, end)
+    return first, last
+
+async def _summary_stats(db: AsyncSession, user_id: int, first: Optional[int], last: Optional[int]):
+    # Só a tabela de resumo: custo proporcional ao número de meses, não de eventos
+    filters = [EventMonthlySummary.user_id == user_id, EventMonthlySummary.eventos > 0]
+    month_index = EventMonthlySummary.year * 12 + EventMonthlySummary.month - 1
+    if first is not None:
+        filters.append(month_index >= first)
+    if last is not None:
+        filters.append(month_index <= last)
+
+    by_status = (await db.execute(
+        select(
+            EventMonthlySummary.status,
+            func.sum(EventMonthlySummary.eventos),
+            func.sum(EventMonthlySummary.valor)
+        ).where(*filters).group_by(EventMonthlySummary.status)
+    )).all()
+
+    monthly = (await db.execute(
+        select(
+            EventMonthlySummary.year,
+            EventMonthlySummary.month,
+            EventMonthlySummary.eventos,
+            EventMonthlySummary.valor
+        ).where(
+            *filters,
+            EventMonthlySummary.status == EventStatus.proposta_aceita
+        ).order_by(EventMonthlySummary.year, EventMonthlySummary.month)
+    )).all()
+    return by_status, monthly
+
+async def _scan_stats(db: AsyncSession, filters: list):
+    by_status = (await db.execute(
+        select(
+            Event.status,
+            func.count(Event.id),
+            func.coalesce(func.sum(Event.valorEvento), 0)
+        ).where(*filters).group_by(Event.status)
+    )).all()
+
+    year_col = extract("year", Event.dataEvento)
+    month_col = extract("month", Event.dataEvento)
+    monthly = (await db.execute(
+        select(
+            year_col,
+            month_col,
+            func.count(Event.id),
+            func.coalesce(func.sum(Event.valorEvento), 0)
+        ).where(
+            *filters,
+            Event.status == EventStatus.proposta_aceita
+        ).group_by(year_col, month_col).order_by(year_col, month_col)
+    )).all()
+    return by_status, monthly
+
+# Estatísticas do dashboard (contagens por status e faturamento mensal).
+# Períodos de meses inteiros (o caso do dashboard) leem event_monthly_summary;
+# datas no meio do mês caem na agregação direta sobre events.
+@router.get("/events/stats", response_model=EventStats)
+async def get_event_stats(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+    year: Optional[int] = Query(None, ge=1900, le=9999),
+    date_from: Optional[date] = Query(None),
+    date_to: Optional[date] = Query(None)
+):
+    if date_from and date_to and date_from > date_to:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="date_from deve ser anterior ou igual a date_to"
+        )
 
-    return events
+    period = _month_period(year, date_from, date_to)
+    if period is not None:
+        by_status, monthly = await _summary_stats(db, current_user.id, *period)
+    else:
+        by_status, monthly = await _scan_stats(
+            db, _stats_filters(current_user.id, year, date_from, date_to)
+        )
+
+    counts = {s: 0 for s in EventStatus}
+    accepted_revenue = 0.0
+    for event_status, count, total in by_status:
+        counts[event_status] = count
+        if event_status == EventStatus.proposta_aceita:
+            accepted_revenue = float(total)
+
+    return EventStats(
+        total=sum(counts.values()),
+        porStatus=counts,
+        faturamentoAceito=accepted_revenue,
+        mensal=[
+            MonthlyEventStats(year=int(y), month=int(m), eventos=count, faturamento=float(total))
+            for y, m, count, total in monthly
+        ]
+    )
+
+# Receita futura por mês: parcelas das propostas aceitas a partir de `start`
+@router.get("/events/cash-flow", response_model=CashFlowProjection)
+async def get_cash_flow(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+    start: Optional[date] = Query(None),
+    months: int = Query(12, ge=1, le=120)
+):
+    start = (start or date.today()).replace(day=1)
+
+    # Sem data do primeiro pagamento, considera o mês do evento
+    first_payment = func.coalesce(Event.dataPrimeiroPagamento, Event.dataEvento)
+    rows = (await db.execute(
+        select(
+            Event.valorEvento,
+            case((Event.iraParcelar & (Event.quantParcelas > 1), Event.quantParcelas), else_=1),
+            # Índice do mês (ano * 12 + mês - 1) usado por cash_flow.project
+            cast(extract("year", first_payment) * 12 + extract("month", first_payment) - 1, Integer)
+        ).where(
+            Event.user_id == current_user.id,
+            Event.status == EventStatus.proposta_aceita,
+            Event.valorEvento.isnot(None)
+        )
+    )).all()
+
+    # Colunas do resultado direto em arrays, sem conversão por evento em Python
+    columns = np.array(rows, dtype=np.float64).reshape(-1, 3)
+    totals, counts = cash_flow.project(columns[:, 0], columns[:, 1], columns[:, 2], start, months)
+
+    return CashFlowProjection(
+        inicio=start,
+        meses=months,
+        total=round(float(totals.sum()), 2),
+        mensal=[
+            CashFlowMonth(year=year, month=month, parcelas=int(count), valor=round(float(total), 2))
+            for (year, month), total, count in zip(cash_flow.month_labels(start, months), totals, counts)
+        ]
+    )
+
+# Eventos de um intervalo de datas (ex.: o mês exibido no calendário)
+@router.get("/events/calendar", response_model=List[EventOut])
+async def get_calendar(
+    request: Request,
+    date_from: date = Query(...),
+    date_to: date = Query(...),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    if date_from > date_to:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="date_from deve ser anterior ou igual a date_to"
+        )
+    if (date_to - date_from).days >= CALENDAR_MAX_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"O intervalo pode ter no máximo {CALENDAR_MAX_DAYS} dias"
+        )
+
+    etag = await _events_etag(db, current_user.id, "calendar", date_from, date_to)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    # Faixa de ix_events_user_dataevento_id, já na ordem do índice
+    result = await db.execute(
+        select(Event)
+        .where(*_stats_filters(current_user.id, None, date_from, date_to))
+        .order_by(Event.dataEvento, Event.id)
+    )
+    return _event_list_response(result.scalars().all(), etag)
+
+# Quais das datas informadas estão livres (sem proposta aceita)
+@router.post("/events/availability", response_model=EventAvailability)
+async def check_availability(
+    payload: EventAvailabilityRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    conflicts = await _booking_conflicts(db, current_user.id, payload.datas)
+    return EventAvailability(dias=[
+        EventAvailabilityDay(data=d, livre=d not in conflicts, eventos=conflicts.get(d, []))
+        for d in dict.fromkeys(payload.datas)
+    ])
+
+# Exportar todos os eventos filtrados em CSV ou NDJSON, em streaming
+@router.get("/events/export")
+async def export_events(
+    current_user: User = Depends(get_current_user),
+    export_format: str = Query("csv", alias="format", pattern="^(csv|ndjson)$"),
+    date_from: Optional[date] = Query(None),
+    date_to: Optional[date] = Query(None),
+    status_filter: Optional[EventStatus] = Query(None, alias="status"),
+    tipo_evento: Optional[str] = Query(None, alias="tipoEvento")
+):
+    if date_from and date_to and date_from > date_to:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="date_from deve ser anterior ou igual a date_to"
+        )
+
+    filters = _stats_filters(current_user.id, None, date_from, date_to)
+    if status_filter is not None:
+        filters.append(Event.status == status_filter)
+    if tipo_evento:
+        filters.append(Event.tipoEvento == tipo_evento)
+
+    logger.info("User %s exporting events as %s", current_user.id, export_format)
+    return StreamingResponse(
+        event_export.stream_events(filters, export_format),
+        media_type=event_export.EXPORT_FORMATS[export_format],
+        headers={"Content-Disposition": f'attachment; filename="eventos.{export_format}"'}
+    )
 
 # Criar evento
 @router.post("/events/", response_model=EventOut, status_code=status.HTTP_201_CREATED)
-def create_event(
+async def create_event(
     request: Request,
+    response: Response,
     event_data: EventCreate,
-    db: Session = Depends(get_db),
+    reject_conflicts: bool = Query(False),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     if event_data.dataEvento < date.today():
@@ -59,48 +403,369 @@ def create_event(
         motivoRecusa=event_data.motivoRecusa
     )
 
+    await _check_booking(db, current_user.id, new_event, response, reject_conflicts)
+
     try:
         db.add(new_event)
-        db.commit()
-        db.refresh(new_event)
-        logger.info(f"User {current_user.id} created event {new_event.id}")
+        delta = SummaryDelta()
+        delta.add(new_event.dataEvento, new_event.status, new_event.valorEvento)
+        await _events_changed(db, current_user.id, delta)
+        await db.commit()
+        await db.refresh(new_event)
+        logger.info("User %s created event %s", current_user.id, new_event.id)
         return new_event
     except Exception as e:
-        db.rollback()
-        logger.error(f"Error creating event: {str(e)}")
+        await db.rollback()
+        logger.error("Error creating event: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Erro ao criar evento"
         )
 
+# Importar eventos em lote a partir de planilha CSV ou XLSX
+@router.post("/events/import", response_model=EventImportResult)
+async def import_events(
+    file: UploadFile = File(...),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    file_format = event_import.detect_format(file.filename)
+    if not file_format:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Formato não suportado, envie um arquivo .csv ou .xlsx"
+        )
+
+    # O upload já está em arquivo temporário; as linhas são lidas e validadas
+    # em blocos no threadpool, então a memória não cresce com o arquivo
+    rows = event_import.iter_rows(file.file, file_format)
+    imported = 0
+    delta = SummaryDelta()
+    errors = []
+    omitted = 0
+
+    try:
+        while True:
+            try:
+                count, valid, chunk_errors = await run_in_threadpool(event_import.read_chunk, rows)
+            except event_import.UNREADABLE_FILE_ERRORS as e:
+                logger.warning("User %s sent an unreadable import file: %s", current_user.id, e)
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Não foi possível ler o arquivo enviado"
+                )
+            if not count:
+                break
+
+            room = max(event_import.EVENT_IMPORT_MAX_ERRORS - len(errors), 0)
+            errors.extend(chunk_errors[:room])
+            omitted += len(chunk_errors[room:])
+
+            if valid:
+                # INSERT multi-linha dentro da mesma transação; commit só no fim
+                await db.execute(
+                    insert(Event),
+                    [{**event.model_dump(), "user_id": current_user.id} for event in valid]
+                )
+                imported += len(valid)
+                for event in valid:
+                    delta.add(event.dataEvento, event.status, event.valorEvento)
+
+        if imported:
+            await _events_changed(db, current_user.id, delta)
+        await db.commit()
+    except HTTPException:
+        await db.rollback()
+        raise
+    except Exception as e:
+        await db.rollback()
+        logger.error("Error importing events: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Erro ao importar eventos"
+        )
+
+    logger.info(
+        "User %s imported %s events (%s rows with errors)",
+        current_user.id, imported, len(errors) + omitted
+    )
+    return EventImportResult(importados=imported, erros=errors, errosOmitidos=omitted)
+
+# Colunas NOT NULL que não podem ser limpas por uma operação do lote
+_REQUIRED_FIELDS = ("nomeCliente", "tipoEvento", "dataOrcamento", "dataEvento", "status")
+
+async def _batch_booking_conflicts(
+    db: AsyncSession, user_id: int, accepted_ops: list, reject: bool
+) -> None:
+    """Mesma checagem de _check_booking para cada atualização do lote.
+
+    Eventos do lote entram com o estado final, não com o que está no banco.
+    Os conflitos vão em `conflitos` do item; com reject, o item falha, não é
+    aplicado e volta a ocupar a data atual.
+    """
+    checked = {}
+    for result, row, changes in accepted_ops:
+        if result.acao == "atualizar":
+            event_date = changes.get("dataEvento", row.dataEvento)
+            if EventStatus(changes.get("status", row.status)) != EventStatus.proposta_recusada:
+                checked[result.id] = event_date
+    if not checked:
+        return
+
+    touched = {result.id for result, _, _ in accepted_ops}
+    stored = await _booking_conflicts(db, user_id, checked.values())
+    outside = {
+        event_date: [event_id for event_id in event_ids if event_id not in touched]
+        for event_date, event_ids in stored.items()
+    }
+
+    while True:
+        booked = {event_date: list(event_ids) for event_date, event_ids in outside.items()}
+        for result, row, changes in accepted_ops:
+            if result.ok and result.acao == "excluir":
+                continue
+            state = changes if result.ok else {}
+            if EventStatus(state.get("status", row.status)) == EventStatus.proposta_aceita:
+                booked.setdefault(state.get("dataEvento", row.dataEvento), []).append(result.id)
+
+        rejected = False
+        for result, _, _ in accepted_ops:
+            if result.id not in checked or not result.ok:
+                continue
+            event_date = checked[result.id]
+            conflicts = sorted(event_id for event_id in booked.get(event_date, []) if event_id != result.id)
+            result.conflitos = conflicts
+            if conflicts and reject:
+                result.ok = False
+                result.erro = _conflict_message(event_date, conflicts)
+                rejected = True
+        # Um item recusado continua na data atual e pode conflitar com outro
+        if not rejected:
+            return
+
+# Atualizar e excluir vários eventos de uma vez, em uma transação
+@router.post("/events/batch", response_model=EventBatchResult)
+async def batch_events(
+    batch: EventBatchRequest,
+    reject_conflicts: bool = Query(False),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    ids = {op.id for op in batch.operacoes}
+    # Um único SELECT traz o que as regras de status precisam
+    current = {
+        row.id: row
+        for row in (await db.execute(
+            select(
+                Event.id, Event.dataEvento, Event.status, Event.valorEvento,
+                Event.dataPrimeiroPagamento, Event.motivoRecusa
+            ).where(Event.user_id == current_user.id, Event.id.in_(ids))
+            # Travadas até o commit: os deltas do resumo partem destas linhas.
+            # Em ordem de id para lotes simultâneos não entrarem em deadlock
+            .order_by(Event.id)
+            .with_for_update()
+        )).all()
+    }
+
+    results = []
+    # Operações válidas: (resultado, linha atual, alterações)
+    accepted_ops = []
+    seen = set()
+
+    for op in batch.operacoes:
+        error = None
+        changes = op.dados.model_dump(exclude_unset=True) if op.dados else {}
+        row = current.get(op.id)
+
+        if op.id in seen:
+            error = "Evento repetido no lote"
+        elif row is None:
+            error = "Evento não encontrado"
+        elif op.acao == "atualizar":
+            empty = [field for field in _REQUIRED_FIELDS if field in changes and changes[field] is None]
+            if not changes:
+                error = "Nenhum campo para atualizar"
+            elif empty:
+                error = f"Campo obrigatório não pode ser vazio: {', '.join(empty)}"
+            else:
+                # Regras aplicadas sobre o estado final (atual + alterações)
+                error = _status_rule_error(
+                    changes.get("status", row.status),
+                    changes.get("valorEvento", row.valorEvento),
+                    changes.get("dataPrimeiroPagamento", row.dataPrimeiroPagamento),
+                    changes.get("motivoRecusa", row.motivoRecusa)
+                )
+        seen.add(op.id)
+
+        result = EventBatchItemResult(id=op.id, acao=op.acao, ok=error is None, erro=error)
+        results.append(result)
+        if not error:
+            accepted_ops.append((result, row, changes))
+
+    await _batch_booking_conflicts(db, current_user.id, accepted_ops, reject_conflicts)
+
+    to_delete = []
+    # Operações com as mesmas alterações viram um único UPDATE ... WHERE id IN (...)
+    updates_by_changes = {}
+    delta = SummaryDelta()
+    for result, row, changes in accepted_ops:
+        if not result.ok:
+            continue
+        if result.acao == "excluir":
+            to_delete.append(result.id)
+        else:
+            delta.remove(row.dataEvento, row.status, row.valorEvento)
+            key = tuple(sorted(changes.items()))
+            updates_by_changes.setdefault(key, []).append(result.id)
+            delta.add(
+                changes.get("dataEvento", row.dataEvento),
+                changes.get("status", row.status),
+                changes.get("valorEvento", row.valorEvento)
+            )
+
+    updated = sum(len(group) for group in updates_by_changes.values())
+    if not updated and not to_delete:
+        return EventBatchResult(atualizados=0, excluidos=0, resultados=results)
+
+    try:
+        for changes, group in updates_by_changes.items():
+            await db.execute(
+                update(Event)
+                .where(Event.user_id == current_user.id, Event.id.in_(group))
+                .values(**dict(changes))
+                .execution_options(synchronize_session=False)
+            )
+        if to_delete:
+            # Delta do que foi de fato excluído
+            deleted = await db.execute(
+                delete(Event)
+                .where(Event.user_id == current_user.id, Event.id.in_(to_delete))
+                .returning(Event.dataEvento, Event.status, Event.valorEvento)
+                .execution_options(synchronize_session=False)
+            )
+            for event_date, event_status, valor in deleted:
+                delta.remove(event_date, event_status, valor)
+        await _events_changed(db, current_user.id, delta)
+        await db.commit()
+    except Exception as e:
+        await db.rollback()
+        logger.error("Error applying event batch: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Erro ao aplicar as alterações em lote"
+        )
+
+    logger.info(
+        "User %s batch: %s events updated, %s deleted (%s statements)",
+        current_user.id, updated, len(to_delete), len(updates_by_changes) + bool(to_delete)
+    )
+    return EventBatchResult(atualizados=updated, excluidos=len(to_delete), resultados=results)
+
+def _search_document():
+    # Mesma expressão do índice ix_events_search_trgm (migration 0007)
+    return func.events_search_text(Event.nomeCliente, Event.tipoEvento, Event.contatoCliente)
+
+def _like_escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+# Buscar eventos por cliente, tipo de evento ou contato, sem diferenciar acentos
+@router.get("/events/search", response_model=List[EventOut])
+async def search_events(
+    request: Request,
+    q: str = Query(..., min_length=3, max_length=100),
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    etag = await _events_etag(db, current_user.id, "search", q, cursor, limit)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    q = q.strip()
+    if len(q) < 3:
+        raise HTTPException(status_code=422, detail="Informe ao menos 3 caracteres para a busca")
+
+    document = _search_document()
+    # Termo normalizado pelo banco com as mesmas funções do índice
+    term = func.f_unaccent(func.lower(q))
+    pattern = func.f_unaccent(func.lower("%" + _like_escape(q) + "%"))
+    rank = func.word_similarity(term, document)
+
+    # Os dois operadores são atendidos pelo índice de trigramas: <% encontra
+    # nomes parecidos (erros de digitação), LIKE encontra trechos exatos
+    # (ex.: parte do telefone)
+    query = select(Event, rank.label("rank")).where(
+        Event.user_id == current_user.id,
+        or_(term.op("<%")(document), document.like(pattern, escape="\\")),
+    )
+
+    after = decode_cursor(cursor, float, int)
+    if after:
+        last_rank, last_id = after
+        query = query.where(or_(rank < last_rank, and_(rank == last_rank, Event.id > last_id)))
+
+    result = await db.execute(query.order_by(rank.desc(), Event.id).limit(limit + 1))
+    rows = result.all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].rank, rows[-1].Event.id)
+
+    return _event_list_response([row.Event for row in rows], etag, next_cursor)
+
 # Buscar evento por ID
 @router.get("/events/{event_id}", response_model=EventOut)
-def get_event(
+async def get_event(
     event_id: int,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    ev = db.query(Event).filter(
+    # O ETag depende só do usuário, da versão dele e do id da URL: o 304 não
+    # consulta a tabela events nem revela se o evento existe
+    etag = await _events_etag(db, current_user.id, "event", event_id)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    ev = await db.scalar(select(Event).where(
         Event.id == event_id,
         Event.user_id == current_user.id
-    ).first()
+    ))
 
     if not ev:
         raise HTTPException(status_code=404, detail="Evento não encontrado")
+    set_cache_headers(response, etag)
     return ev
 
+def _status_rule_error(event_status, valor, data_primeiro_pagamento, motivo_recusa) -> Optional[str]:
+    """Campos obrigatórios conforme o status da proposta; devolve a mensagem de erro"""
+    if event_status == "proposta_enviada" and not valor:
+        return "Valor do evento é obrigatório para propostas enviadas"
+    if event_status == "proposta_aceita" and not data_primeiro_pagamento:
+        return "Data do primeiro pagamento é obrigatória para propostas aceitas"
+    if event_status == "proposta_recusada" and not motivo_recusa:
+        return "Motivo da recusa é obrigatório para propostas recusadas"
+    return None
+
 # Atualizar evento
 @router.patch("/events/{event_id}", response_model=EventOut)
-def update_event(
+async def update_event(
     event_id: int,
     updates: EventUpdate,
-    db: Session = Depends(get_db),
+    response: Response,
+    reject_conflicts: bool = Query(False),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    db_event = db.query(Event).filter(
+    # FOR UPDATE: PATCHes simultâneos do mesmo evento esperam um pelo outro,
+    # e o delta do resumo parte do estado que o outro acabou de gravar
+    db_event = await db.scalar(select(Event).where(
         Event.id == event_id,
         Event.user_id == current_user.id
-    ).first()
+    ).with_for_update())
 
     if not db_event:
         raise HTTPException(status_code=404, detail="Evento não encontrado")
@@ -111,35 +776,39 @@ def update_event(
 
     validated = EventUpdate(**update_data)
 
-    if validated.status == "proposta_enviada" and not validated.valorEvento:
-        raise HTTPException(
-            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-            detail="Valor do evento é obrigatório para propostas enviadas"
-        )
-
-    if validated.status == "proposta_aceita" and not validated.dataPrimeiroPagamento:
+    error = _status_rule_error(
+        validated.status, validated.valorEvento,
+        validated.dataPrimeiroPagamento, validated.motivoRecusa
+    )
+    if error:
         raise HTTPException(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-            detail="Data do primeiro pagamento é obrigatória para propostas aceitas"
+            detail=error
         )
 
-    if validated.status == "proposta_recusada" and not validated.motivoRecusa:
-        raise HTTPException(
-            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-            detail="Motivo da recusa é obrigatório para propostas recusadas"
-        )
+    delta = SummaryDelta()
+    delta.remove(db_event.dataEvento, db_event.status, db_event.valorEvento)
 
     for key, value in validated.dict(exclude_unset=True).items():
         setattr(db_event, key, value)
 
+    delta.add(db_event.dataEvento, db_event.status, db_event.valorEvento)
+
     try:
-        db.commit()
-        db.refresh(db_event)
-        logger.info(f"User {current_user.id} updated event {event_id}")
+        await _check_booking(db, current_user.id, db_event, response, reject_conflicts)
+    except HTTPException:
+        await db.rollback()
+        raise
+
+    try:
+        await _events_changed(db, current_user.id, delta)
+        await db.commit()
+        await db.refresh(db_event)
+        logger.info("User %s updated event %s", current_user.id, event_id)
         return db_event
     except Exception as e:
-        db.rollback()
-        logger.error(f"Error updating event {event_id}: {str(e)}")
+        await db.rollback()
+        logger.error("Error updating event %s: %s", event_id, e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Erro ao atualizar evento"
@@ -147,27 +816,34 @@ def update_event(
 
 # Deletar evento
 @router.delete("/events/{event_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_event(
+async def delete_event(
     event_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    db_event = db.query(Event).filter(
-        Event.id == event_id,
-        Event.user_id == current_user.id
-    ).first()
+    # O delta vem da linha que o DELETE travou e removeu: em DELETEs
+    # simultâneos só um recebe a linha, o outro responde 404
+    deleted = (await db.execute(
+        delete(Event)
+        .where(Event.id == event_id, Event.user_id == current_user.id)
+        .returning(Event.dataEvento, Event.status, Event.valorEvento)
+        .execution_options(synchronize_session=False)
+    )).first()
 
-    if not db_event:
+    if not deleted:
+        await db.rollback()
         raise HTTPException(status_code=404, detail="Evento não encontrado")
 
     try:
-        db.delete(db_event)
-        db.commit()
-        logger.info(f"User {current_user.id} deleted event {event_id}")
+        delta = SummaryDelta()
+        delta.remove(deleted.dataEvento, deleted.status, deleted.valorEvento)
+        await _events_changed(db, current_user.id, delta)
+        await db.commit()
+        logger.info("User %s deleted event %s", current_user.id, event_id)
         return
     except Exception as e:
-        db.rollback()
-        logger.error(f"Error deleting event {event_id}: {str(e)}")
+        await db.rollback()
+        logger.error("Error deleting event %s: %s", event_id, e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Erro ao excluir evento"
@@ -1,26 +1,64 @@
 
-from fastapi import APIRouter, Depends, HTTPException, Request
-from sqlalchemy.orm import Session
-from app.core.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.auth.auth_handler import get_current_admin
+from app.core.database import AsyncSessionLocal, get_async_db
+from app.core.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
 from app.models.models import Lead
+from app.services.lead_buffer import LEADS_WRITE_BEHIND, BufferFull, lead_buffer
+from app.services.lead_forwarder import OutboxFull, lead_forwarder
 from pydantic import BaseModel, EmailStr
 from typing import Optional
+from datetime import datetime
 import json
-import httpx
+import os
 
+# Leads buscados por vez no cursor do servidor no modo NDJSON
+LEAD_STREAM_BATCH_SIZE = int(os.getenv("LEAD_STREAM_BATCH_SIZE", "1000"))
+
+# Captura pública de leads (formulário do site)
 router = APIRouter(
     prefix="/leads",
     tags=["leads"],
     responses={404: {"description": "Not found"}},
 )
 
+# Leitura dos leads (dados pessoais): só administradores
+admin_router = APIRouter(
+    prefix="/leads",
+    tags=["leads"],
+    dependencies=[Depends(get_current_admin)],
+    responses={404: {"description": "Not found"}},
+)
+
 class LeadCreate(BaseModel):
     name: str
     email: EmailStr
     phone: str
 
 @router.post("/")
-def create_lead(lead: LeadCreate, db: Session = Depends(get_db)):
+async def create_lead(lead: LeadCreate, response: Response, db: AsyncSession = Depends(get_async_db)):
+    if LEADS_WRITE_BEHIND:
+        # Só enfileira: o lead é gravado junto com outros em um INSERT multi-linha
+        data = {
+            "name": lead.name,
+            "email": lead.email,
+            "phone": lead.phone,
+            "created_at": datetime.utcnow(),
+        }
+        try:
+            lead_buffer.add(data)
+        except BufferFull:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Muitos leads aguardando gravação, tente novamente em instantes",
+                headers={"Retry-After": "1"},
+            )
+        response.status_code = status.HTTP_202_ACCEPTED
+        return {"status": "success", "lead": data}
+
     # Cria um novo lead no banco de dados
     db_lead = Lead(
         name=lead.name, 
@@ -28,43 +66,94 @@ def create_lead(lead: LeadCreate, db: Session = Depends(get_db)):
         phone=lead.phone
     )
     db.add(db_lead)
-    db.commit()
-    db.refresh(db_lead)
+    await db.commit()
+    await db.refresh(db_lead)
     return {"status": "success", "lead": db_lead}
 
-@router.post("/googlesheet")
+@router.post("/googlesheet", status_code=status.HTTP_202_ACCEPTED)
 async def create_lead_googlesheet(lead: LeadCreate):
     """
-    This endpoint sends lead data to Google Sheets via N8N workflow
-    instead of saving it to the database.
+    Enfileira o lead para envio ao Google Sheets via workflow do N8N.
+    A entrega (em lotes, com retentativas) acontece em segundo plano.
     """
     try:
-        # Replace this URL with your actual N8N webhook URL that connects to Google Sheets
-        n8n_webhook_url = "https://your-n8n-instance.com/webhook/google-sheets-integration"
-        
-        # Send data to N8N webhook which will handle Google Sheets integration
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                n8n_webhook_url,
-                json={
-                    "name": lead.name,
-                    "email": lead.email,
-                    "phone": lead.phone,
-                    "source": "website_form"
-                },
-                timeout=10.0
-            )
-            
-        if response.status_code >= 400:
-            return {"status": "error", "message": f"N8N webhook returned error: {response.status_code}"}
-            
-        return {"status": "success", "message": "Lead sent to Google Sheets and N8N automation triggered"}
-    
-    except Exception as e:
-        return {"status": "error", "message": f"Failed to connect to N8N: {str(e)}"}
-
-@router.get("/")
-def get_all_leads(db: Session = Depends(get_db)):
-    # Recupera todos os leads
-    leads = db.query(Lead).all()
-    return {"leads": leads}
+        lead_forwarder.enqueue({
+            "name": lead.name,
+            "email": lead.email,
+            "phone": lead.phone,
+            "source": "website_form"
+        })
+    except OutboxFull:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Muitos leads aguardando envio, tente novamente em instantes",
+            headers={"Retry-After": "5"},
+        )
+
+    return {"status": "success", "message": "Lead recebido e enfileirado para o Google Sheets"}
+
+# Estado do envio ao webhook e do buffer de gravação
+@admin_router.get("/stats")
+async def get_lead_stats():
+    return {
+        "write_behind": LEADS_WRITE_BEHIND,
+        "buffer": lead_buffer.snapshot(),
+        "forwarder": lead_forwarder.stats(),
+    }
+
+def _lead_dict(lead: Lead) -> dict:
+    return {
+        "id": lead.id,
+        "name": lead.name,
+        "email": lead.email,
+        "phone": lead.phone,
+        "created_at": lead.created_at.isoformat() if lead.created_at else None,
+    }
+
+async def _stream_leads(filters: list):
+    # Sessão própria: a da dependência já foi fechada quando o corpo é enviado
+    async with AsyncSessionLocal() as db:
+        result = await db.stream_scalars(
+            select(Lead)
+            .where(*filters)
+            .order_by(Lead.created_at, Lead.id)
+            .execution_options(yield_per=LEAD_STREAM_BATCH_SIZE)
+        )
+        async for leads in result.partitions():
+            yield "".join(json.dumps(_lead_dict(lead), ensure_ascii=False) + "\n" for lead in leads).encode()
+
+@admin_router.get("/")
+async def get_all_leads(
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(100, ge=1, le=1000),
+    created_from: Optional[datetime] = Query(None),
+    created_to: Optional[datetime] = Query(None),
+    export_format: str = Query("json", alias="format", pattern="^(json|ndjson)$")
+):
+    # Leads ordenados por (created_at, id), paginados por cursor ou, com
+    # format=ndjson, exportados por completo em streaming
+    filters = []
+    if created_from is not None:
+        filters.append(Lead.created_at >= created_from)
+    if created_to is not None:
+        filters.append(Lead.created_at <= created_to)
+
+    if export_format == "ndjson":
+        return StreamingResponse(_stream_leads(filters), media_type="application/x-ndjson")
+
+    after = decode_cursor(cursor, datetime, int)
+    if after:
+        filters.append(tuple_(Lead.created_at, Lead.id) > tuple_(*after))
+
+    result = await db.execute(
+        select(Lead).where(*filters).order_by(Lead.created_at, Lead.id).limit(limit + 1)
+    )
+    leads = result.scalars().all()
+
+    if len(leads) > limit:
+        leads = leads[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(leads[-1].created_at, leads[-1].id)
+
+    return {"leads": [_lead_dict(lead) for lead in leads]}
@@ -1,24 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Response
-from sqlalchemy.orm import Session
-from passlib.context import CryptContext
-from datetime import datetime, timedelta
-from app.core.database import get_db
-from app.models.models import User, RefreshToken
+from fastapi import APIRouter, Cookie, Depends, HTTPException, status, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from app.core.database import get_async_db
+from app.models.models import User
 from app.schemas.user import UserCreate, UserLogin, TokenResponse
 from app.auth.auth_handler import create_access_token, get_current_user
-from app.auth.token_utils import verify_token
-import uuid
+from app.auth.password import hash_password, verify_password
+from app.auth.refresh_tokens import REFRESH_TOKEN_EXPIRE_DAYS, refresh_token_store
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
 router = APIRouter()
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 # Configurações de tokens
 ACCESS_TOKEN_EXPIRE_MINUTES = 60
-REFRESH_TOKEN_EXPIRE_DAYS = 7
 
 # Validação de senha
 def validate_password(password: str) -> bool:
@@ -33,9 +31,9 @@ def validate_password(password: str) -> bool:
 
 # Cadastro de usuário
 @router.post("/users/", status_code=201)
-async def create_user(user: UserCreate, db: Session = Depends(get_db)):
+async def create_user(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
     # Validar email único
-    db_user = db.query(User).filter(User.email == user.email).first()
+    db_user = await db.scalar(select(User).where(User.email == user.email))
     if db_user:
         raise HTTPException(status_code=400, detail="Email já cadastrado")
     
@@ -46,53 +44,47 @@ async def create_user(user: UserCreate, db: Session = Depends(get_db)):
             detail="Senha deve ter pelo menos 8 caracteres, incluindo letras e números"
         )
     
-    # Hash da senha com bcrypt
-    hashed_password = pwd_context.hash(user.password)
+    # Hash da senha com bcrypt (executado no pool dedicado, fora do event loop)
+    hashed_password = await hash_password(user.password)
     new_user = User(
         name=user.name,
         email=user.email,
         hashed_password=hashed_password
     )
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
     return {"id": new_user.id, "email": new_user.email}
 
-# Gerar refresh token
-def create_refresh_token(user_id: int, db: Session):
-    # Remover tokens expirados
-    expired_tokens = db.query(RefreshToken).filter(
-        RefreshToken.user_id == user_id,
-        RefreshToken.expires_at < datetime.utcnow()
-    ).all()
-    
-    for token in expired_tokens:
-        db.delete(token)
-    
-    # Criar novo token
-    token_value = str(uuid.uuid4())
-    expires_at = datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
-    
-    refresh_token = RefreshToken(
-        token=token_value,
-        user_id=user_id,
-        expires_at=expires_at
+def _set_refresh_cookie(response: Response, token: str) -> None:
+    # Cookie seguro para o refresh token (em produção usar secure=True)
+    response.set_cookie(
+        key="refresh_token",
+        value=token,
+        httponly=True,
+        max_age=REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60,
+        samesite="lax",
+        # secure=True,  # Descomente em produção com HTTPS
     )
-    
-    db.add(refresh_token)
-    db.commit()
-    return token_value, expires_at
 
 # Login de usuário
 @router.post("/login", response_model=TokenResponse)
-async def login(user: UserLogin, response: Response, db: Session = Depends(get_db)):
-    db_user = db.query(User).filter(User.email == user.email).first()
-    if not db_user or not pwd_context.verify(user.password, db_user.hashed_password):
+async def login(user: UserLogin, response: Response, db: AsyncSession = Depends(get_async_db)):
+    db_user = await db.scalar(select(User).where(User.email == user.email))
+    valid, new_hash = False, None
+    if db_user:
+        valid, new_hash = await verify_password(user.password, db_user.hashed_password)
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Credenciais inválidas"
         )
 
+    # Hash gerado com custo menor que o atual: regravar com o custo atual
+    # (persistido no mesmo commit do refresh token)
+    if new_hash:
+        db_user.hashed_password = new_hash
+
     # Criar access token
     access_token = create_access_token({
         "sub": db_user.email,
@@ -100,18 +92,10 @@ async def login(user: UserLogin, response: Response, db: Session = Depends(get_d
         "name": db_user.name
     })
     
-    # Criar refresh token
-    refresh_token, refresh_expires = create_refresh_token(db_user.id, db)
-    
-    # Configurar cookie seguro para refresh token (em produção usar secure=True)
-    response.set_cookie(
-        key="refresh_token",
-        value=refresh_token,
-        httponly=True,
-        max_age=7 * 24 * 60 * 60,  # 7 dias
-        samesite="lax",
-        # secure=True,  # Descomente em produção com HTTPS
-    )
+    # Criar refresh token (os expirados são limpos em segundo plano)
+    refresh_token, _ = await refresh_token_store.issue(db, db_user.id)
+    await db.commit()
+    _set_refresh_cookie(response, refresh_token)
     
     return {
         "access_token": access_token,
@@ -125,33 +109,37 @@ async def login(user: UserLogin, response: Response, db: Session = Depends(get_d
 
 # Refresh token
 @router.post("/refresh-token", response_model=TokenResponse)
-async def refresh_token(response: Response, db: Session = Depends(get_db), refresh_token: str = None):
-    # Verificar se o token foi enviado
+async def refresh_token(
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    refresh_token: Optional[str] = None,
+    refresh_cookie: Optional[str] = Cookie(None, alias="refresh_token")
+):
+    # Aceita o token pela query (clientes antigos) ou pelo cookie do login
+    refresh_token = refresh_token or refresh_cookie
     if not refresh_token:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Refresh token não fornecido"
         )
     
-    # Buscar token no banco
-    token_record = db.query(RefreshToken).filter(
-        RefreshToken.token == refresh_token,
-        RefreshToken.expires_at > datetime.utcnow()
-    ).first()
-    
-    if not token_record:
+    # Rotação em um único statement: apaga o token usado e grava o novo
+    rotated = await refresh_token_store.rotate(db, refresh_token)
+    if not rotated:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Token inválido ou expirado"
         )
+    user_id, new_refresh_token, _ = rotated
     
     # Buscar usuário
-    user = db.query(User).filter(User.id == token_record.user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Usuário não encontrado"
         )
+    await db.commit()
     
     # Criar novo access token
     access_token = create_access_token({
@@ -160,22 +148,7 @@ async def refresh_token(response: Response, db: Session = Depends(get_db), refre
         "name": user.name
     })
     
-    # Opcional: rotacionar o refresh token para maior segurança
-    new_refresh_token, refresh_expires = create_refresh_token(user.id, db)
-    
-    # Remover token antigo
-    db.delete(token_record)
-    db.commit()
-    
-    # Configurar novo cookie
-    response.set_cookie(
-        key="refresh_token",
-        value=new_refresh_token,
-        httponly=True,
-        max_age=7 * 24 * 60 * 60,
-        samesite="lax",
-        # secure=True,  # Descomente em produção com HTTPS
-    )
+    _set_refresh_cookie(response, new_refresh_token)
     
     return {
         "access_token": access_token,
@@ -189,7 +162,15 @@ async def refresh_token(response: Response, db: Session = Depends(get_db), refre
 
 # Logout
 @router.post("/logout")
-async def logout(response: Response, current_user: User = Depends(get_current_user)):
-    # Limpar cookie de refresh token
+async def logout(
+    response: Response,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    refresh_cookie: Optional[str] = Cookie(None, alias="refresh_token")
+):
+    # Revogar o refresh token da sessão e limpar o cookie
+    if refresh_cookie:
+        await refresh_token_store.revoke(db, refresh_cookie)
+        await db.commit()
     response.delete_cookie(key="refresh_token")
     return {"message": "Logout realizado com sucesso"}
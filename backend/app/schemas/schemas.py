@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import Dict, List, Literal, Optional
 from datetime import date
 from enum import Enum
 
@@ -9,6 +9,9 @@ class EventStatus(str, Enum):
     proposta_aceita = "proposta_aceita"
     proposta_recusada = "proposta_recusada"
 
+# Limite de parcelas de um evento (10 anos de parcelas mensais)
+MAX_PARCELAS = 120
+
 class EventCreate(BaseModel):
     nomeCliente: str
     tipoEvento: str
@@ -18,7 +21,7 @@ class EventCreate(BaseModel):
 
     valorEvento: Optional[float] = None
     iraParcelar: Optional[bool] = False
-    quantParcelas: Optional[int] = None
+    quantParcelas: Optional[int] = Field(None, ge=1, le=MAX_PARCELAS)
     dataPrimeiroPagamento: Optional[date] = None
     
     contatoCliente: Optional[str]
@@ -36,7 +39,7 @@ class EventUpdate(BaseModel):
     status: Optional[EventStatus]
     valorEvento: Optional[float]
     iraParcelar: Optional[bool]
-    quantParcelas: Optional[int]
+    quantParcelas: Optional[int] = Field(ge=1, le=MAX_PARCELAS)
     dataPrimeiroPagamento: Optional[date]
     
     contatoCliente: Optional[str]
@@ -57,4 +60,91 @@ class EventOut(BaseModel):
     motivoRecusa: Optional[str]
 
     class Config:
-        from_attributes = True  # pydantic v2, substitui orm_mode = True
\ No newline at end of file
+        from_attributes = True  # pydantic v2, substitui orm_mode = True
+
+class MonthlyEventStats(BaseModel):
+    year: int
+    month: int
+    eventos: int
+    faturamento: float
+
+class EventStats(BaseModel):
+    """Agregados do dashboard calculados no banco"""
+    total: int
+    porStatus: Dict[EventStatus, int]
+    faturamentoAceito: float
+    mensal: List[MonthlyEventStats]
+
+class EventImportFieldError(BaseModel):
+    campo: str
+    mensagem: str
+
+class EventImportRowError(BaseModel):
+    linha: int
+    erros: List[EventImportFieldError]
+
+class EventImportResult(BaseModel):
+    """Resumo da importação em lote; linhas com erro não são gravadas"""
+    importados: int
+    erros: List[EventImportRowError]
+    errosOmitidos: int = 0
+
+class EventBatchChanges(BaseModel):
+    """Campos a alterar em uma operação do lote; só os enviados são aplicados"""
+    nomeCliente: Optional[str] = None
+    tipoEvento: Optional[str] = None
+    dataOrcamento: Optional[date] = None
+    dataEvento: Optional[date] = None
+    status: Optional[EventStatus] = None
+    valorEvento: Optional[float] = None
+    iraParcelar: Optional[bool] = None
+    quantParcelas: Optional[int] = Field(None, ge=1, le=MAX_PARCELAS)
+    dataPrimeiroPagamento: Optional[date] = None
+    contatoCliente: Optional[str] = None
+    motivoRecusa: Optional[str] = None
+
+class EventBatchItem(BaseModel):
+    id: int
+    acao: Literal["atualizar", "excluir"] = "atualizar"
+    dados: Optional[EventBatchChanges] = None
+
+class EventBatchRequest(BaseModel):
+    operacoes: List[EventBatchItem] = Field(..., min_length=1, max_length=500)
+
+class EventBatchItemResult(BaseModel):
+    id: int
+    acao: str
+    ok: bool
+    erro: Optional[str] = None
+    # Propostas aceitas na mesma data do estado final do evento
+    conflitos: List[int] = []
+
+class EventBatchResult(BaseModel):
+    atualizados: int
+    excluidos: int
+    resultados: List[EventBatchItemResult]
+
+class EventAvailabilityRequest(BaseModel):
+    datas: List[date] = Field(..., min_length=1, max_length=366)
+
+class EventAvailabilityDay(BaseModel):
+    data: date
+    livre: bool
+    eventos: List[int]
+
+class EventAvailability(BaseModel):
+    """Datas já ocupadas por propostas aceitas"""
+    dias: List[EventAvailabilityDay]
+
+class CashFlowMonth(BaseModel):
+    year: int
+    month: int
+    parcelas: int
+    valor: float
+
+class CashFlowProjection(BaseModel):
+    """Parcelas a receber das propostas aceitas, mês a mês"""
+    inicio: date
+    meses: int
+    total: float
+    mensal: List[CashFlowMonth]
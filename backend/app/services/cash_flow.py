@@ -0,0 +1,67 @@
+"""Projeção do fluxo de caixa mensal a partir das parcelas dos eventos.
+
+Todas as parcelas de todos os eventos são geradas de uma vez com aritmética
+vetorizada do NumPy sobre índices de mês, sem laço por evento. O índice do
+mês de cada evento (ano * 12 + mês - 1) já vem calculado pela consulta.
+"""
+from datetime import date
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+
+def _month_index(value: date) -> int:
+    return value.year * 12 + value.month - 1
+
+
+def project(
+    valores: Sequence[float],
+    parcelas: Sequence[int],
+    primeiros_meses: Sequence[int],
+    start: date,
+    months: int,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Distribui cada valor em parcelas mensais a partir do mês do primeiro
+    pagamento (índice ano * 12 + mês - 1).
+
+    Retorna, para cada um dos `months` meses a partir do mês de `start`, o
+    valor total a receber e a quantidade de parcelas. Os centavos que sobram
+    da divisão ficam na última parcela, então a soma das parcelas de um
+    evento é sempre o valor do evento.
+    """
+    totals = np.zeros(months, dtype=np.float64)
+    counts = np.zeros(months, dtype=np.int64)
+    if not len(valores):
+        return totals, counts
+
+    cents = np.round(np.asarray(valores, dtype=np.float64) * 100).astype(np.int64)
+    n = np.asarray(parcelas, dtype=np.int64).clip(min=1)
+    first = np.asarray(primeiros_meses, dtype=np.int64)
+
+    base = cents // n
+    last = cents - base * (n - 1)
+
+    # Só as parcelas dentro da janela [start, start + months): parcelas
+    # lo..hi-1 de cada evento. Assim a memória é limitada por eventos x
+    # meses, não pelo número total de parcelas.
+    window_start = _month_index(start)
+    lo = np.clip(window_start - first, 0, n)
+    hi = np.clip(window_start + months - first, 0, n)
+    inside = hi - lo
+
+    # Uma posição por parcela na janela: evento de origem e número da parcela
+    event_idx = np.repeat(np.arange(len(n)), inside)
+    k = lo[event_idx] + np.arange(inside.sum()) - np.repeat(np.cumsum(inside) - inside, inside)
+
+    offsets = first[event_idx] + k - window_start
+    amounts = np.where(k == n[event_idx] - 1, last[event_idx], base[event_idx])
+
+    totals = np.bincount(offsets, weights=amounts, minlength=months) / 100
+    counts = np.bincount(offsets, minlength=months)
+    return totals, counts
+
+
+def month_labels(start: date, months: int) -> List[Tuple[int, int]]:
+    """(ano, mês) de cada posição devolvida por project"""
+    first = _month_index(start)
+    return [((first + i) // 12, (first + i) % 12 + 1) for i in range(months)]
@@ -0,0 +1,82 @@
+"""Exportação de eventos em streaming (CSV / NDJSON)"""
+import csv
+import io
+import json
+import os
+from datetime import date
+from enum import Enum
+from typing import AsyncIterator, List
+
+from dotenv import load_dotenv
+from sqlalchemy import select
+
+from app.core.database import AsyncSessionLocal
+from app.models.models import Event
+from app.schemas.schemas import EventOut
+
+load_dotenv()
+
+# Linhas buscadas por vez no cursor do servidor (e enviadas por chunk)
+EVENT_EXPORT_BATCH_SIZE = int(os.getenv("EVENT_EXPORT_BATCH_SIZE", "1000"))
+
+EXPORT_FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+# Mesmas colunas e ordem do EventOut
+COLUMNS = list(EventOut.model_fields)
+
+
+def _json_value(value):
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+def _csv_chunk(rows, header: bool = False) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(COLUMNS)
+    for row in rows:
+        writer.writerow(_json_value(value) for value in row)
+    return buffer.getvalue()
+
+
+def _ndjson_chunk(rows) -> str:
+    return "".join(
+        json.dumps(
+            {key: _json_value(value) for key, value in zip(COLUMNS, row)},
+            ensure_ascii=False,
+        ) + "\n"
+        for row in rows
+    )
+
+
+async def stream_events(filters: List, export_format: str) -> AsyncIterator[bytes]:
+    """Gera o arquivo em blocos direto de um cursor no servidor.
+
+    Abre a própria sessão: a sessão da dependência já foi fechada quando o
+    corpo do StreamingResponse começa a ser enviado.
+    """
+    if export_format == "csv":
+        # BOM para o Excel reconhecer UTF-8; o cabeçalho sai antes da consulta
+        yield ("﻿" + _csv_chunk((), header=True)).encode()
+
+    query = (
+        select(*(getattr(Event, column) for column in COLUMNS))
+        .where(*filters)
+        .order_by(Event.dataEvento, Event.id)
+        .execution_options(yield_per=EVENT_EXPORT_BATCH_SIZE)
+    )
+
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(query)
+        async for rows in result.partitions():
+            if export_format == "csv":
+                yield _csv_chunk(rows).encode()
+            else:
+                yield _ndjson_chunk(rows).encode()
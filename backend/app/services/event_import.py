@@ -0,0 +1,123 @@
+"""Leitura e validação de planilhas de orçamentos para importação em lote"""
+import csv
+import io
+import os
+import zipfile
+from datetime import datetime
+from itertools import islice
+from typing import Any, BinaryIO, Dict, Iterator, List, Tuple
+
+from dotenv import load_dotenv
+from openpyxl import load_workbook
+from pydantic import ValidationError
+
+from app.schemas.schemas import EventCreate
+
+load_dotenv()
+
+# Linhas validadas e inseridas por vez
+EVENT_IMPORT_CHUNK_SIZE = int(os.getenv("EVENT_IMPORT_CHUNK_SIZE", "500"))
+# Máximo de linhas com erro detalhadas na resposta
+EVENT_IMPORT_MAX_ERRORS = int(os.getenv("EVENT_IMPORT_MAX_ERRORS", "1000"))
+
+SUPPORTED_FORMATS = ("csv", "xlsx")
+
+# Erros de leitura de um arquivo corrompido ou com codificação inválida
+UNREADABLE_FILE_ERRORS = (ValueError, KeyError, OSError, csv.Error, zipfile.BadZipFile)
+
+Row = Tuple[int, Dict[str, Any]]
+
+# Campos com valor padrão no schema: célula vazia usa o padrão em vez de
+# validar None (ex.: status vazio vira orcamento_recebido)
+_DEFAULTED_FIELDS = frozenset(
+    name for name, field in EventCreate.model_fields.items() if not field.is_required()
+)
+
+
+def detect_format(filename: str) -> str:
+    extension = os.path.splitext(filename or "")[1].lower().lstrip(".")
+    return extension if extension in SUPPORTED_FORMATS else ""
+
+
+def _clean(value: Any) -> Any:
+    if isinstance(value, str):
+        value = value.strip()
+        return value or None
+    if isinstance(value, datetime):
+        # Células de data do Excel chegam como datetime à meia-noite
+        return value.date()
+    return value
+
+
+def iter_csv_rows(fileobj: BinaryIO) -> Iterator[Row]:
+    """Lê o CSV linha a linha; aceita ',', ';' (Excel pt-BR) e tab como separador"""
+    text = io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="")
+    sample = text.read(8192)
+    text.seek(0)
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+    except csv.Error:
+        dialect = csv.excel
+
+    reader = csv.DictReader(text, dialect=dialect)
+    # A linha 1 é o cabeçalho
+    for line, row in enumerate(reader, start=2):
+        yield line, {
+            (key or "").strip(): _clean(value)
+            for key, value in row.items()
+            if key
+        }
+    text.detach()
+
+
+def iter_xlsx_rows(fileobj: BinaryIO) -> Iterator[Row]:
+    """Lê a primeira aba em modo read_only (streaming, sem carregar a planilha inteira)"""
+    workbook = load_workbook(fileobj, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [str(cell).strip() if cell is not None else "" for cell in next(rows, ())]
+        for line, values in enumerate(rows, start=2):
+            if all(value is None for value in values):
+                continue
+            yield line, {
+                key: _clean(value)
+                for key, value in zip(header, values)
+                if key
+            }
+    finally:
+        workbook.close()
+
+
+def iter_rows(fileobj: BinaryIO, file_format: str) -> Iterator[Row]:
+    if file_format == "xlsx":
+        return iter_xlsx_rows(fileobj)
+    return iter_csv_rows(fileobj)
+
+
+def read_chunk(rows: Iterator[Row], size: int = EVENT_IMPORT_CHUNK_SIZE) -> Tuple[int, List[EventCreate], List[dict]]:
+    """Lê até `size` linhas e valida cada uma contra EventCreate.
+
+    Retorna quantas linhas foram lidas (0 = fim do arquivo), as válidas e os
+    erros por linha. É síncrona: deve rodar no threadpool.
+    """
+    chunk = list(islice(rows, size))
+    valid, errors = [], []
+    for line, row in chunk:
+        try:
+            valid.append(EventCreate.model_validate({
+                key: value
+                for key, value in row.items()
+                if value is not None or key not in _DEFAULTED_FIELDS
+            }))
+        except ValidationError as exc:
+            errors.append({
+                "linha": line,
+                "erros": [
+                    {
+                        "campo": ".".join(str(part) for part in error["loc"]),
+                        "mensagem": error["msg"],
+                    }
+                    for error in exc.errors()
+                ],
+            })
+    return len(chunk), valid, errors
@@ -0,0 +1,89 @@
+"""Manutenção incremental da tabela event_monthly_summary.
+
+Cada escrita em events acumula deltas (+1/-1 evento, +/- valor) por
+(ano, mês do evento, status) e os aplica com um único upsert multi-linha
+na mesma transação da escrita.
+"""
+from collections import defaultdict
+from datetime import date
+from typing import List, Optional
+
+from sqlalchemy import Integer, cast, delete, extract, func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.models import Event, EventMonthlySummary
+from app.schemas.schemas import EventStatus
+
+_KEY_COLUMNS = ["user_id", "year", "month", "status"]
+
+
+class SummaryDelta:
+    def __init__(self):
+        # (ano, mês, status) -> [eventos, valor]
+        self._deltas = defaultdict(lambda: [0, 0.0])
+
+    def add(self, event_date: date, event_status, valor: Optional[float], sign: int = 1) -> None:
+        entry = self._deltas[(event_date.year, event_date.month, EventStatus(event_status))]
+        entry[0] += sign
+        entry[1] += sign * (valor or 0.0)
+
+    def remove(self, event_date: date, event_status, valor: Optional[float]) -> None:
+        self.add(event_date, event_status, valor, sign=-1)
+
+    def rows(self, user_id: int) -> List[dict]:
+        # Ordenadas pela chave: transações concorrentes do mesmo usuário
+        # travam as linhas na mesma ordem (sem deadlock)
+        return [
+            {
+                "user_id": user_id,
+                "year": year,
+                "month": month,
+                "status": event_status,
+                "eventos": eventos,
+                "valor": valor,
+            }
+            for (year, month, event_status), (eventos, valor) in sorted(
+                self._deltas.items(), key=lambda item: (item[0][0], item[0][1], item[0][2].value)
+            )
+            # Mudanças que se anulam (ex.: só o nome mudou) não geram escrita
+            if eventos or valor
+        ]
+
+    async def apply(self, db: AsyncSession, user_id: int) -> None:
+        rows = self.rows(user_id)
+        if not rows:
+            return
+        stmt = pg_insert(EventMonthlySummary).values(rows)
+        await db.execute(stmt.on_conflict_do_update(
+            index_elements=_KEY_COLUMNS,
+            set_={
+                "eventos": EventMonthlySummary.eventos + stmt.excluded.eventos,
+                "valor": EventMonthlySummary.valor + stmt.excluded.valor,
+            },
+        ))
+
+
+def rebuild_statements(user_id: Optional[int] = None) -> list:
+    """DELETE + INSERT ... SELECT que recalculam o resumo a partir de events"""
+    year = cast(extract("year", Event.dataEvento), Integer)
+    month = cast(extract("month", Event.dataEvento), Integer)
+
+    source = select(
+        Event.user_id,
+        year,
+        month,
+        Event.status,
+        func.count(Event.id),
+        func.coalesce(func.sum(Event.valorEvento), 0),
+    ).where(Event.user_id.isnot(None)).group_by(Event.user_id, year, month, Event.status)
+
+    clear = delete(EventMonthlySummary)
+    if user_id is not None:
+        source = source.where(Event.user_id == user_id)
+        clear = clear.where(EventMonthlySummary.user_id == user_id)
+
+    fill = pg_insert(EventMonthlySummary).from_select(
+        _KEY_COLUMNS + ["eventos", "valor"], source
+    )
+    return [clear, fill]
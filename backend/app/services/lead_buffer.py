@@ -0,0 +1,162 @@
+"""Gravação write-behind de leads.
+
+Com LEADS_WRITE_BEHIND ativo, create_lead só valida o lead e o coloca num
+buffer em memória; um worker grava o buffer com um INSERT multi-linha
+quando ele atinge LEAD_BUFFER_SIZE leads ou a cada LEAD_BUFFER_FLUSH_INTERVAL.
+Leads ainda no buffer são perdidos se o processo morrer sem shutdown.
+"""
+import asyncio
+import logging
+import os
+import threading
+import time
+from typing import List, Optional
+
+from dotenv import load_dotenv
+from sqlalchemy import insert
+
+from app.core.database import AsyncSessionLocal
+from app.models.models import Lead
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+LEADS_WRITE_BEHIND = os.getenv("LEADS_WRITE_BEHIND", "false").lower() in ("1", "true", "yes")
+# Tamanho que dispara a gravação imediata do buffer
+LEAD_BUFFER_SIZE = int(os.getenv("LEAD_BUFFER_SIZE", "100"))
+# Tempo máximo que um lead espera no buffer, em segundos
+LEAD_BUFFER_FLUSH_INTERVAL = float(os.getenv("LEAD_BUFFER_FLUSH_INTERVAL", "0.5"))
+# Leads pendentes aceitos (inclusive após falhas de gravação); acima disso o endpoint responde 503
+LEAD_BUFFER_MAX_PENDING = int(os.getenv("LEAD_BUFFER_MAX_PENDING", "10000"))
+
+
+class FlushStats:
+    """Tamanho e latência dos lotes gravados"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.leads = 0
+        self.failures = 0
+        self.max_batch = 0
+        self.flush_seconds = 0.0
+        self.max_flush_seconds = 0.0
+        # Do aceite do lead mais antigo do lote até o commit
+        self.max_wait_seconds = 0.0
+
+    def observe(self, size: int, seconds: float, wait_seconds: float) -> None:
+        with self._lock:
+            self.batches += 1
+            self.leads += size
+            self.max_batch = max(self.max_batch, size)
+            self.flush_seconds += seconds
+            self.max_flush_seconds = max(self.max_flush_seconds, seconds)
+            self.max_wait_seconds = max(self.max_wait_seconds, wait_seconds)
+
+    def observe_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "batches": self.batches,
+                "leads": self.leads,
+                "failures": self.failures,
+                "avg_batch": round(self.leads / self.batches, 2) if self.batches else 0.0,
+                "max_batch": self.max_batch,
+                "avg_flush_seconds": round(self.flush_seconds / self.batches, 6) if self.batches else 0.0,
+                "max_flush_seconds": round(self.max_flush_seconds, 6),
+                "max_wait_seconds": round(self.max_wait_seconds, 6),
+            }
+
+
+class BufferFull(Exception):
+    pass
+
+
+class LeadBuffer:
+    def __init__(
+        self,
+        size: int = LEAD_BUFFER_SIZE,
+        flush_interval: float = LEAD_BUFFER_FLUSH_INTERVAL,
+        max_pending: int = LEAD_BUFFER_MAX_PENDING,
+    ):
+        self.size = max(size, 1)
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.stats = FlushStats()
+
+        # (instante do aceite, colunas do lead)
+        self._pending: List[tuple] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self._worker is not None:
+            return
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._worker = asyncio.create_task(self._run(), name="lead-buffer")
+
+    async def stop(self) -> None:
+        """Para o worker e grava o que ainda estiver no buffer"""
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+        await self.flush()
+        if self._pending:
+            logger.error("Shutdown: %d leads do buffer não foram gravados", len(self._pending))
+
+    def add(self, lead: dict) -> None:
+        if len(self._pending) >= self.max_pending:
+            raise BufferFull()
+        self._pending.append((time.monotonic(), lead))
+        if len(self._pending) >= self.size:
+            self._wakeup.set()
+
+    def snapshot(self) -> dict:
+        return {"pending": len(self._pending), **self.stats.snapshot()}
+
+    async def flush(self) -> int:
+        async with self._flush_lock:
+            batch, self._pending = self._pending, []
+            if not batch:
+                return 0
+
+            start = time.monotonic()
+            try:
+                async with AsyncSessionLocal() as db:
+                    await db.execute(insert(Lead), [lead for _, lead in batch])
+                    await db.commit()
+            except Exception:
+                # Devolve o lote ao início do buffer para a próxima tentativa
+                self._pending[:0] = batch
+                self.stats.observe_failure()
+                logger.exception("Erro ao gravar lote de %d leads", len(batch))
+                return 0
+
+            end = time.monotonic()
+            self.stats.observe(len(batch), end - start, end - batch[0][0])
+            return len(batch)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            # shield: um cancelamento no shutdown não interrompe um INSERT em
+            # andamento; stop() espera por ele no lock antes do flush final
+            await asyncio.shield(self.flush())
+
+
+lead_buffer = LeadBuffer()
@@ -0,0 +1,251 @@
+"""Entrega de leads ao webhook do N8N (integração com Google Sheets).
+
+Os leads entram numa fila em memória e um worker os envia em lotes por um
+cliente HTTP compartilhado, com retentativas e backoff exponencial. Lotes
+que esgotam as tentativas vão para um dead-letter store.
+"""
+import asyncio
+import json
+import logging
+import os
+import random
+import time
+from collections import Counter, deque
+from datetime import datetime, timezone
+from typing import List, Optional
+
+import httpx
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+N8N_WEBHOOK_URL = os.getenv(
+    "N8N_WEBHOOK_URL",
+    "https://your-n8n-instance.com/webhook/google-sheets-integration",
+)
+# Leads aguardando envio; acima disso o endpoint responde 503
+LEAD_OUTBOX_SIZE = int(os.getenv("LEAD_OUTBOX_SIZE", "1000"))
+# Máximo de leads por requisição ao webhook
+LEAD_BATCH_SIZE = int(os.getenv("LEAD_BATCH_SIZE", "50"))
+# Quanto tempo o primeiro lead de um lote espera por outros, em segundos
+LEAD_FLUSH_INTERVAL = float(os.getenv("LEAD_FLUSH_INTERVAL", "1.0"))
+LEAD_MAX_RETRIES = int(os.getenv("LEAD_MAX_RETRIES", "5"))
+LEAD_RETRY_BASE_DELAY = float(os.getenv("LEAD_RETRY_BASE_DELAY", "0.5"))
+LEAD_RETRY_MAX_DELAY = float(os.getenv("LEAD_RETRY_MAX_DELAY", "30"))
+LEAD_WEBHOOK_TIMEOUT = float(os.getenv("LEAD_WEBHOOK_TIMEOUT", "10"))
+# Tempo máximo para esvaziar a fila no shutdown
+LEAD_SHUTDOWN_TIMEOUT = float(os.getenv("LEAD_SHUTDOWN_TIMEOUT", "5"))
+# Arquivo JSONL para os leads não entregues; sem ele ficam só em memória
+LEAD_DEAD_LETTER_PATH = os.getenv("LEAD_DEAD_LETTER_PATH")
+
+
+class MemoryDeadLetterStore:
+    """Guarda os últimos lotes não entregues em memória (perdidos no restart)"""
+
+    def __init__(self, maxlen: int = 1000):
+        self.entries = deque(maxlen=maxlen)
+
+    async def put(self, leads: List[dict], reason: str) -> None:
+        self.entries.append({
+            "failed_at": datetime.now(timezone.utc).isoformat(),
+            "reason": reason,
+            "leads": leads,
+        })
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+class JsonlDeadLetterStore:
+    """Acrescenta cada lote não entregue como uma linha JSON em um arquivo"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.count = 0
+
+    def _append(self, line: str) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+    async def put(self, leads: List[dict], reason: str) -> None:
+        line = json.dumps({
+            "failed_at": datetime.now(timezone.utc).isoformat(),
+            "reason": reason,
+            "leads": leads,
+        }, ensure_ascii=False)
+        await asyncio.to_thread(self._append, line)
+        self.count += 1
+
+    def __len__(self) -> int:
+        return self.count
+
+
+class OutboxFull(Exception):
+    pass
+
+
+class _PermanentError(Exception):
+    """Resposta que não vai mudar com uma nova tentativa (ex.: 400, 404)"""
+
+
+class LeadForwarder:
+    def __init__(
+        self,
+        url: str = N8N_WEBHOOK_URL,
+        dead_letter=None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        outbox_size: int = LEAD_OUTBOX_SIZE,
+        batch_size: int = LEAD_BATCH_SIZE,
+        flush_interval: float = LEAD_FLUSH_INTERVAL,
+        max_retries: int = LEAD_MAX_RETRIES,
+        retry_base_delay: float = LEAD_RETRY_BASE_DELAY,
+        retry_max_delay: float = LEAD_RETRY_MAX_DELAY,
+        timeout: float = LEAD_WEBHOOK_TIMEOUT,
+    ):
+        self.url = url
+        self.dead_letter = dead_letter or MemoryDeadLetterStore()
+        self.transport = transport
+        self.outbox_size = outbox_size
+        self.batch_size = max(batch_size, 1)
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self.timeout = timeout
+
+        self.counters = Counter()
+        self._queue: Optional[asyncio.Queue] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self._worker is not None:
+            return
+        self._queue = asyncio.Queue(maxsize=self.outbox_size)
+        # Um cliente para todo o processo: conexões TCP/TLS reaproveitadas
+        self._client = httpx.AsyncClient(
+            timeout=self.timeout,
+            transport=self.transport,
+            limits=httpx.Limits(max_connections=10, max_keepalive_connections=5),
+        )
+        self._worker = asyncio.create_task(self._run(), name="lead-forwarder")
+
+    async def stop(self, timeout: float = LEAD_SHUTDOWN_TIMEOUT) -> None:
+        """Tenta entregar o que está na fila; o que sobrar vai para o dead-letter"""
+        if self._worker is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Shutdown do envio de leads: %d leads ainda na fila", self._queue.qsize())
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+
+        leftover = []
+        while not self._queue.empty():
+            leftover.append(self._queue.get_nowait())
+        if leftover:
+            await self._dead_letter(leftover, "shutdown")
+
+        await self._client.aclose()
+        self._worker = None
+        self._client = None
+
+    def enqueue(self, lead: dict) -> None:
+        if self._queue is None:
+            raise RuntimeError("LeadForwarder não foi iniciado")
+        try:
+            self._queue.put_nowait(lead)
+        except asyncio.QueueFull:
+            self.counters["rejected"] += 1
+            raise OutboxFull()
+        self.counters["enqueued"] += 1
+
+    def stats(self) -> dict:
+        return {
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "dead_letter_size": len(self.dead_letter),
+            **self.counters,
+        }
+
+    async def _fill_batch(self, batch: List[dict]) -> None:
+        # Preenche a lista recebida para que, se cancelado aqui, o chamador
+        # ainda saiba quais leads já saíram da fila
+        batch.append(await self._queue.get())
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+
+    async def _run(self) -> None:
+        while True:
+            batch = []
+            try:
+                await self._fill_batch(batch)
+                await self._deliver(batch)
+            except asyncio.CancelledError:
+                # Cancelado no meio de um lote: a entrega não foi confirmada
+                if batch:
+                    await self._dead_letter(batch, "shutdown")
+                raise
+            except Exception:
+                logger.exception("Erro inesperado ao enviar lote de %d leads", len(batch))
+                await self._dead_letter(batch, "erro inesperado")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _deliver(self, batch: List[dict]) -> None:
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = await self._client.post(self.url, json=batch)
+                if response.status_code < 400:
+                    self.counters["delivered"] += len(batch)
+                    self.counters["batches"] += 1
+                    return
+                if response.status_code != 429 and response.status_code < 500:
+                    raise _PermanentError(f"HTTP {response.status_code}")
+                reason = f"HTTP {response.status_code}"
+            except httpx.TransportError as e:
+                reason = f"{type(e).__name__}: {e}"
+            except _PermanentError as e:
+                await self._dead_letter(batch, str(e))
+                return
+
+            if attempt < self.max_retries:
+                self.counters["retries"] += 1
+                # Backoff exponencial com jitter para não sincronizar as tentativas
+                delay = min(self.retry_max_delay, self.retry_base_delay * 2 ** attempt)
+                await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+
+        await self._dead_letter(batch, reason)
+
+    async def _dead_letter(self, batch: List[dict], reason: str) -> None:
+        self.counters["dead_lettered"] += len(batch)
+        logger.error("%d leads não entregues ao webhook (%s)", len(batch), reason)
+        try:
+            await self.dead_letter.put(batch, reason)
+        except Exception:
+            logger.exception("Falha ao gravar %d leads no dead-letter", len(batch))
+
+
+def _dead_letter_from_env():
+    if LEAD_DEAD_LETTER_PATH:
+        return JsonlDeadLetterStore(LEAD_DEAD_LETTER_PATH)
+    return MemoryDeadLetterStore()
+
+
+lead_forwarder = LeadForwarder(dead_letter=_dead_letter_from_env())
@@ -0,0 +1,116 @@
+"""Micro-benchmark da serialização da listagem de eventos.
+
+Compara, para uma página de eventos (100 por padrão), o caminho padrão do
+FastAPI (response_model + JSONResponse), o mesmo caminho com ORJSONResponse
+e o caminho rápido de list_events (TypeAdapter validando e gerando os
+bytes JSON de uma vez). A aplicação ASGI é chamada diretamente, sem rede
+nem banco:
+
+    cd backend
+    python -m benchmarks.bench_events_serialization --requests 2000
+
+Imprime um JSON com o tempo de CPU médio por requisição de cada variante e
+a economia em relação ao caminho padrão.
+"""
+import argparse
+import asyncio
+import json
+import time
+from datetime import date, timedelta
+from typing import List
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
+from pydantic import TypeAdapter
+
+from app.schemas.schemas import EventOut, EventStatus
+from benchmarks.bench_security_headers import _call
+
+_adapter = TypeAdapter(List[EventOut])
+
+
+class FakeEvent:
+    """Objeto com os mesmos atributos de um Event carregado do banco"""
+
+    def __init__(self, i: int):
+        self.id = i
+        self.user_id = 1
+        self.nomeCliente = f"Cliente {i} da Silva"
+        self.tipoEvento = "Casamento"
+        self.dataOrcamento = date(2025, 1, 1) + timedelta(days=i % 30)
+        self.dataEvento = date(2025, 6, 1) + timedelta(days=i)
+        self.status = list(EventStatus)[i % 4]
+        self.valorEvento = 1500.0 + i
+        self.iraParcelar = bool(i % 2)
+        self.quantParcelas = 3 if i % 2 else None
+        self.dataPrimeiroPagamento = date(2025, 2, 1) if i % 2 else None
+        self.contatoCliente = "(11) 99999-0000"
+        self.motivoRecusa = None
+
+
+def build_app(variant: str, events: list) -> FastAPI:
+    if variant == "type_adapter":
+        app = FastAPI(default_response_class=ORJSONResponse)
+
+        @app.get("/events/", response_model=List[EventOut])
+        async def list_events():
+            return Response(
+                content=_adapter.dump_json(_adapter.validate_python(events, from_attributes=True)),
+                media_type="application/json",
+            )
+        return app
+
+    response_class = ORJSONResponse if variant == "orjson_response" else JSONResponse
+    app = FastAPI(default_response_class=response_class)
+
+    @app.get("/events/", response_model=List[EventOut])
+    async def list_events():
+        return events
+    return app
+
+
+def _body(messages) -> bytes:
+    return b"".join(m.get("body", b"") for m in messages if m["type"] == "http.response.body")
+
+
+async def run(requests: int, page_size: int) -> dict:
+    events = [FakeEvent(i) for i in range(page_size)]
+    variants = {name: build_app(name, events) for name in ("padrao", "orjson_response", "type_adapter")}
+
+    # Confirma que todas as variantes devolvem o mesmo conteúdo
+    expected = json.loads(_body(await _call(variants["padrao"], "/events/")))
+    for name, app in variants.items():
+        assert json.loads(_body(await _call(app, "/events/"))) == expected, name
+
+    results = {}
+    for name, app in variants.items():
+        for _ in range(min(requests, 200)):  # aquecimento
+            await _call(app, "/events/")
+        cpu_start, wall_start = time.process_time(), time.perf_counter()
+        for _ in range(requests):
+            await _call(app, "/events/")
+        cpu = time.process_time() - cpu_start
+        wall = time.perf_counter() - wall_start
+        results[name] = {
+            "cpu_us_por_requisicao": round(cpu / requests * 1e6, 1),
+            "us_por_requisicao": round(wall / requests * 1e6, 1),
+        }
+
+    baseline = results["padrao"]["cpu_us_por_requisicao"]
+    for name in ("orjson_response", "type_adapter"):
+        saved = baseline - results[name]["cpu_us_por_requisicao"]
+        results[name]["cpu_economizada_us"] = round(saved, 1)
+        results[name]["cpu_economizada_pct"] = round(saved / baseline * 100, 1)
+    return {"eventos_por_pagina": page_size, "requests": requests, "resultados": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--page-size", type=int, default=100)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.requests, args.page_size)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
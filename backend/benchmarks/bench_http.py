@@ -0,0 +1,291 @@
+"""Benchmark HTTP da API: vazão e latência (p50/p95/p99) por cenário.
+
+Sobe app.main:app com uvicorn (ou usa um servidor já rodando com --url),
+autentica os usuários criados por benchmarks.seed e executa cada cenário
+por --duration segundos com --concurrency requisições simultâneas:
+
+    cd backend
+    python -m benchmarks.seed
+    python -m benchmarks.bench_http --concurrency 32 --duration 15 --output resultados/atual.json
+
+Cenários: login, auth (GET de evento respondido com 304, ou seja, só a
+dependência de autenticação e a versão dos eventos), list_events,
+get_event, update_event e create_lead. O resultado é um JSON que pode ser
+comparado entre commits com benchmarks.compare. Ver benchmarks/README.md.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+import httpx
+
+from benchmarks.seed import BENCH_DOMAIN, BENCH_PASSWORD, bench_email
+
+SCENARIOS = ("login", "auth", "list_events", "get_event", "update_event", "create_lead")
+
+
+class UserContext:
+    def __init__(self, email: str, token: str, events: List[dict]):
+        self.email = email
+        self.headers = {"Authorization": f"Bearer {token}"}
+        self.events = events
+        # id do evento -> ETag, usado pelo cenário auth
+        self.etags: Dict[int, str] = {}
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Percentil por posição mais próxima sobre valores já ordenados"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> dict:
+    latencies.sort()
+    ms = [v * 1000 for v in latencies]
+    return {
+        "requisicoes": len(ms),
+        "erros": errors,
+        "rps": round(len(ms) / elapsed, 1) if elapsed else 0.0,
+        "latencia_ms": {
+            "p50": round(percentile(ms, 50), 2),
+            "p95": round(percentile(ms, 95), 2),
+            "p99": round(percentile(ms, 99), 2),
+            "max": round(ms[-1], 2) if ms else 0.0,
+            "media": round(sum(ms) / len(ms), 2) if ms else 0.0,
+        },
+    }
+
+
+async def _login(client: httpx.AsyncClient, email: str) -> httpx.Response:
+    return await client.post("/api/login", json={"email": email, "password": BENCH_PASSWORD})
+
+
+async def setup_users(client: httpx.AsyncClient, users: int) -> List[UserContext]:
+    contexts = []
+    for n in range(users):
+        email = bench_email(n)
+        response = await _login(client, email)
+        if response.status_code != 200:
+            raise SystemExit(f"Login de {email} falhou ({response.status_code}); rode benchmarks.seed antes")
+        ctx = UserContext(email, response.json()["access_token"], [])
+        page = await client.get("/api/events/", params={"limit": 100}, headers=ctx.headers)
+        page.raise_for_status()
+        ctx.events = page.json()
+        if not ctx.events:
+            raise SystemExit(f"{email} não tem eventos; rode benchmarks.seed com --events-per-user > 0")
+        contexts.append(ctx)
+    return contexts
+
+
+async def _refresh_etags(client: httpx.AsyncClient, contexts: List[UserContext]) -> None:
+    for ctx in contexts:
+        ctx.etags = {}
+        for event in ctx.events[:10]:
+            response = await client.get(f"/api/events/{event['id']}", headers=ctx.headers)
+            response.raise_for_status()
+            ctx.etags[event["id"]] = response.headers["etag"]
+
+
+def _update_body(event: dict, rng: random.Random) -> dict:
+    body = {k: v for k, v in event.items() if k != "id"}
+    body["valorEvento"] = round(rng.uniform(800, 15000), 2)
+    return body
+
+
+def build_request(name: str, client: httpx.AsyncClient) -> Callable:
+    """Devolve a função que faz uma requisição do cenário e diz se deu certo"""
+
+    async def login(ctx: UserContext, rng: random.Random, n: int) -> bool:
+        return (await _login(client, ctx.email)).status_code == 200
+
+    async def auth(ctx: UserContext, rng: random.Random, n: int) -> bool:
+        event_id, etag = rng.choice(list(ctx.etags.items()))
+        response = await client.get(
+            f"/api/events/{event_id}", headers={**ctx.headers, "If-None-Match": etag}
+        )
+        return response.status_code == 304
+
+    async def list_events(ctx: UserContext, rng: random.Random, n: int) -> bool:
+        response = await client.get("/api/events/", params={"limit": 100}, headers=ctx.headers)
+        return response.status_code == 200
+
+    async def get_event(ctx: UserContext, rng: random.Random, n: int) -> bool:
+        event = rng.choice(ctx.events)
+        return (await client.get(f"/api/events/{event['id']}", headers=ctx.headers)).status_code == 200
+
+    async def update_event(ctx: UserContext, rng: random.Random, n: int) -> bool:
+        event = rng.choice(ctx.events)
+        response = await client.patch(
+            f"/api/events/{event['id']}", json=_update_body(event, rng), headers=ctx.headers
+        )
+        return response.status_code == 200
+
+    async def create_lead(ctx: UserContext, rng: random.Random, n: int) -> bool:
+        response = await client.post("/api/leads/", json={
+            "name": "Lead Benchmark",
+            "email": f"lead-run-{n}@{BENCH_DOMAIN}",
+            "phone": "(11) 90000-0000",
+        })
+        return response.status_code in (200, 202)
+
+    return {
+        "login": login,
+        "auth": auth,
+        "list_events": list_events,
+        "get_event": get_event,
+        "update_event": update_event,
+        "create_lead": create_lead,
+    }[name]
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    name: str,
+    contexts: List[UserContext],
+    concurrency: int,
+    duration: float,
+    warmup: float,
+) -> dict:
+    if name == "auth":
+        await _refresh_etags(client, contexts)
+    request = build_request(name, client)
+
+    latencies: List[float] = []
+    errors = 0
+    counter = 0
+    start = time.perf_counter()
+    measure_from = start + warmup
+    deadline = measure_from + duration
+
+    async def worker(index: int) -> None:
+        nonlocal errors, counter
+        ctx = contexts[index % len(contexts)]
+        rng = random.Random(index)
+        while True:
+            sent = time.perf_counter()
+            if sent >= deadline:
+                return
+            counter += 1
+            try:
+                ok = await request(ctx, rng, counter)
+            except httpx.HTTPError:
+                ok = False
+            if sent < measure_from:
+                continue
+            if ok:
+                latencies.append(time.perf_counter() - sent)
+            else:
+                errors += 1
+
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    return summarize(latencies, errors, duration)
+
+
+def start_server(port: int, workers: int) -> subprocess.Popen:
+    env = {"LOG_LEVEL": "WARNING", **os.environ}
+    return subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "app.main:app",
+            "--host", "127.0.0.1", "--port", str(port),
+            "--workers", str(workers), "--no-access-log",
+        ],
+        env=env,
+    )
+
+
+async def wait_ready(url: str, timeout: float = 60) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=url) as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get("/ready")).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.5)
+    raise SystemExit(f"Servidor em {url} não ficou pronto em {timeout:.0f}s")
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args) -> dict:
+    await wait_ready(args.url)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=30) as client:
+        contexts = await setup_users(client, args.users)
+        results = {}
+        for name in args.scenarios:
+            results[name] = await run_scenario(
+                client, name, contexts, args.concurrency, args.duration, args.warmup
+            )
+            print(f"{name}: {json.dumps(results[name])}", file=sys.stderr)
+
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "data": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "url": args.url,
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "warmup": args.warmup,
+            "usuarios": args.users,
+            "server_workers": None if args.external else args.workers,
+            "python": platform.python_version(),
+        },
+        "cenarios": results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="servidor já rodando (não sobe o uvicorn)")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=1, help="workers do uvicorn")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10, help="segundos medidos por cenário")
+    parser.add_argument("--warmup", type=float, default=2, help="segundos descartados no início de cada cenário")
+    parser.add_argument("--users", type=int, default=10, help="usuários do seed usados pelos workers")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--output", help="grava o JSON também neste arquivo")
+    args = parser.parse_args(argv)
+
+    args.external = bool(args.url)
+    server = None
+    if not args.external:
+        args.url = f"http://127.0.0.1:{args.port}"
+        server = start_server(args.port, args.workers)
+    try:
+        report = asyncio.run(run(args))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Micro-benchmark do middleware de headers de segurança.
+
+Compara a versão antiga (BaseHTTPMiddleware) com a versão ASGI pura de
+app.core.middleware, chamando a aplicação ASGI diretamente (sem rede):
+
+    cd backend
+    python -m benchmarks.bench_security_headers --requests 20000
+
+Imprime um JSON com o custo médio por requisição de cada variante e o
+custo adicionado em relação à aplicação sem middleware.
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from starlette.applications import Starlette
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+from app.core.middleware import SecurityHeadersMiddleware
+
+
+class LegacySecurityHeadersMiddleware(BaseHTTPMiddleware):
+    """Cópia da implementação anterior, mantida só para comparação"""
+
+    async def dispatch(self, request: Request, call_next):
+        response = await call_next(request)
+        response.headers["X-Content-Type-Options"] = "nosniff"
+        response.headers["X-Frame-Options"] = "DENY"
+        response.headers["Content-Security-Policy"] = (
+            "default-src 'self'; "
+            "connect-src 'self'; "
+            "img-src 'self' data: https://fastapi.tiangolo.com; "
+            "script-src 'self' 'unsafe-inline' https://cdn.jsdelivr.net; "
+            "style-src 'self' 'unsafe-inline' https://cdn.jsdelivr.net;"
+        )
+        response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
+        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
+        return response
+
+
+async def health(request):
+    return JSONResponse({"status": "healthy"})
+
+
+async def stream(request):
+    async def chunks():
+        for i in range(10):
+            yield f"{i}\n".encode()
+    return StreamingResponse(chunks(), media_type="text/plain")
+
+
+def build_app(middleware=None):
+    app = Starlette(routes=[Route("/health", health), Route("/stream", stream)])
+    if middleware is not None:
+        app.add_middleware(middleware)
+    return app
+
+
+def _scope(path):
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"localhost")],
+        "client": ("127.0.0.1", 12345),
+        "server": ("localhost", 8000),
+    }
+
+
+async def _call(app, path):
+    messages = []
+    body_sent = False
+
+    async def receive():
+        nonlocal body_sent
+        if not body_sent:
+            body_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # Como num servidor real: depois do corpo, só retorna quando o cliente desconecta
+        await asyncio.Event().wait()
+
+    async def send(message):
+        messages.append(message)
+
+    await app(_scope(path), receive, send)
+    return messages
+
+
+async def run(requests: int, path: str) -> dict:
+    variants = {
+        "sem_middleware": build_app(),
+        "base_http_middleware": build_app(LegacySecurityHeadersMiddleware),
+        "asgi_puro": build_app(SecurityHeadersMiddleware),
+    }
+
+    # Confirma que as duas versões produzem os mesmos headers
+    for name in ("base_http_middleware", "asgi_puro"):
+        start = (await _call(variants[name], path))[0]
+        header_names = {k.lower() for k, _ in start["headers"]}
+        assert b"content-security-policy" in header_names, name
+
+    results = {}
+    for name, app in variants.items():
+        for _ in range(min(requests, 500)):  # aquecimento
+            await _call(app, path)
+        start = time.perf_counter()
+        for _ in range(requests):
+            await _call(app, path)
+        elapsed = time.perf_counter() - start
+        results[name] = {"us_por_requisicao": round(elapsed / requests * 1e6, 2)}
+
+    baseline = results["sem_middleware"]["us_por_requisicao"]
+    for name in ("base_http_middleware", "asgi_puro"):
+        results[name]["overhead_us"] = round(results[name]["us_por_requisicao"] - baseline, 2)
+    return {"path": path, "requests": requests, "resultados": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--path", default="/health", choices=["/health", "/stream"])
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.requests, args.path)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
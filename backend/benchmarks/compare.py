@@ -0,0 +1,73 @@
+"""Compara dois resultados de benchmarks.bench_http.
+
+    cd backend
+    python -m benchmarks.compare resultados/main.json resultados/atual.json --threshold 10
+
+Imprime, por cenário, a variação percentual de rps e das latências p50,
+p95 e p99 do segundo arquivo em relação ao primeiro. Sai com código 1 se
+algum cenário piorou mais que --threshold por cento em rps ou p95 (ou
+passou a ter erros), para poder barrar a regressão no CI.
+"""
+import argparse
+import json
+import sys
+
+
+def _change(before: float, after: float) -> float:
+    if not before:
+        return 0.0
+    return round((after - before) / before * 100, 1)
+
+
+def compare(base: dict, current: dict, threshold: float) -> dict:
+    cenarios = {}
+    regressoes = []
+    for name, before in base["cenarios"].items():
+        after = current["cenarios"].get(name)
+        if after is None:
+            continue
+        result = {
+            "rps_pct": _change(before["rps"], after["rps"]),
+            **{
+                f"{p}_pct": _change(before["latencia_ms"][p], after["latencia_ms"][p])
+                for p in ("p50", "p95", "p99")
+            },
+            "erros": after["erros"],
+        }
+        cenarios[name] = result
+        if (
+            result["rps_pct"] < -threshold
+            or result["p95_pct"] > threshold
+            or (after["erros"] and not before["erros"])
+        ):
+            regressoes.append(name)
+
+    return {
+        "base": base["meta"].get("commit"),
+        "atual": current["meta"].get("commit"),
+        "threshold_pct": threshold,
+        "cenarios": cenarios,
+        "regressoes": regressoes,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("base")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=10, help="piora tolerada, em %%")
+    args = parser.parse_args(argv)
+
+    with open(args.base, encoding="utf-8") as f:
+        base = json.load(f)
+    with open(args.current, encoding="utf-8") as f:
+        current = json.load(f)
+
+    result = compare(base, current, args.threshold)
+    print(json.dumps(result, indent=2))
+    if result["regressoes"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
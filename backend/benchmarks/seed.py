@@ -0,0 +1,133 @@
+"""Popula o banco com dados sintéticos para o benchmark HTTP.
+
+Uso (a partir de backend/, com o .env apontando para o banco do benchmark):
+    python -m benchmarks.seed --users 20 --events-per-user 2000 --leads 50000
+
+Cria usuários bench-<n>@bench.example.com, todos com a senha BENCH_PASSWORD,
+seus eventos (datas de um ano atrás a um ano à frente, todos os status) e
+leads avulsos. Rodar de novo apaga e recria só os dados do benchmark. Com a
+mesma --seed os dados gerados são sempre os mesmos.
+"""
+import argparse
+import json
+import os
+import random
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import delete, insert, select
+
+from app.auth import password
+from app.core.database import SessionLocal
+from app.models.models import Event, EventMonthlySummary, Lead, RefreshToken, User
+from app.schemas.schemas import EventStatus
+from app.services.event_summary import rebuild_statements
+
+BENCH_DOMAIN = "bench.example.com"
+BENCH_PASSWORD = os.getenv("BENCH_PASSWORD", "benchmark123")
+INSERT_BATCH_SIZE = 5000
+
+_NOMES = ["Ana", "João", "Maria", "José", "Beatriz", "Conceição", "Luís", "Fábio", "Letícia", "Otávio"]
+_SOBRENOMES = ["Silva", "Souza", "Araújo", "Gonçalves", "Lima", "Ribeiro", "Assunção", "Brandão"]
+_TIPOS = ["Casamento", "Aniversário", "Formatura", "Ensaio", "Batizado", "Corporativo"]
+
+
+def bench_email(n: int) -> str:
+    return f"bench-{n}@{BENCH_DOMAIN}"
+
+
+def _nome(rng: random.Random) -> str:
+    return f"{rng.choice(_NOMES)} {rng.choice(_SOBRENOMES)}"
+
+
+def _event(rng: random.Random, user_id: int, today: date) -> dict:
+    event_status = rng.choice(list(EventStatus))
+    data_evento = today + timedelta(days=rng.randint(-365, 365))
+    parcelas = rng.choice([None, 2, 3, 6, 10])
+    row = {
+        "user_id": user_id,
+        "nomeCliente": _nome(rng),
+        "tipoEvento": rng.choice(_TIPOS),
+        "dataOrcamento": data_evento - timedelta(days=rng.randint(30, 180)),
+        "dataEvento": data_evento,
+        "status": event_status,
+        "valorEvento": round(rng.uniform(800, 15000), 2),
+        "iraParcelar": parcelas is not None,
+        "quantParcelas": parcelas,
+        "dataPrimeiroPagamento": None,
+        "contatoCliente": f"(11) 9{rng.randint(1000, 9999)}-{rng.randint(1000, 9999)}",
+        "motivoRecusa": None,
+    }
+    # Mesmas regras de _status_rule_error, para que o PATCH do benchmark seja aceito
+    if event_status == EventStatus.proposta_aceita:
+        row["dataPrimeiroPagamento"] = data_evento - timedelta(days=rng.randint(0, 60))
+    if event_status == EventStatus.proposta_recusada:
+        row["motivoRecusa"] = "Orçamento acima do esperado"
+    return row
+
+
+def _insert_batches(db, model, rows) -> None:
+    for start in range(0, len(rows), INSERT_BATCH_SIZE):
+        db.execute(insert(model), rows[start:start + INSERT_BATCH_SIZE])
+
+
+def _clear(db) -> None:
+    user_ids = select(User.id).where(User.email.like(f"%@{BENCH_DOMAIN}")).scalar_subquery()
+    db.execute(delete(RefreshToken).where(RefreshToken.user_id.in_(user_ids)))
+    db.execute(delete(EventMonthlySummary).where(EventMonthlySummary.user_id.in_(user_ids)))
+    db.execute(delete(Event).where(Event.user_id.in_(user_ids)))
+    db.execute(delete(User).where(User.email.like(f"%@{BENCH_DOMAIN}")))
+    db.execute(delete(Lead).where(Lead.email.like(f"%@{BENCH_DOMAIN}")))
+
+
+def seed(users: int, events_per_user: int, leads: int, seed_value: int = 42) -> dict:
+    rng = random.Random(seed_value)
+    today = date.today()
+
+    # Mesmo custo do servidor (BCRYPT_ROUNDS): senão o primeiro login de
+    # cada usuário regrava o hash e distorce as medições
+    password.calibrate_rounds()
+    hashed = password.pwd_context.hash(BENCH_PASSWORD)
+
+    with SessionLocal() as db:
+        _clear(db)
+        user_ids = db.scalars(
+            insert(User).returning(User.id),
+            [{"email": bench_email(n), "name": f"Benchmark {n}", "hashed_password": hashed, "is_active": True}
+             for n in range(users)],
+        ).all()
+
+        _insert_batches(db, Event, [
+            _event(rng, user_id, today) for user_id in user_ids for _ in range(events_per_user)
+        ])
+
+        now = datetime.utcnow()
+        _insert_batches(db, Lead, [
+            {
+                "name": _nome(rng),
+                "email": f"lead-{n}@{BENCH_DOMAIN}",
+                "phone": f"(21) 9{rng.randint(1000, 9999)}-{rng.randint(1000, 9999)}",
+                "created_at": now - timedelta(minutes=n),
+            }
+            for n in range(leads)
+        ])
+
+        for user_id in user_ids:
+            for stmt in rebuild_statements(user_id):
+                db.execute(stmt)
+        db.commit()
+
+    return {"usuarios": len(user_ids), "eventos": len(user_ids) * events_per_user, "leads": leads}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--events-per-user", type=int, default=2000)
+    parser.add_argument("--leads", type=int, default=50000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+    print(json.dumps(seed(args.users, args.events_per_user, args.leads, args.seed)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""baseline: tabelas users, events, leads e refresh_tokens
+
+Revision ID: 0001
+Revises:
+Create Date: 2025-05-20 10:00:00
+
+Bancos criados antes das migrations (via Base.metadata.create_all) já têm
+essas tabelas; por isso cada uma só é criada se ainda não existir. Nesses
+bancos também é possível rodar `alembic stamp 0001` e seguir com upgrade.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+event_status = sa.Enum(
+    "orcamento_recebido",
+    "proposta_enviada",
+    "proposta_aceita",
+    "proposta_recusada",
+    name="eventstatus",
+)
+
+
+def upgrade() -> None:
+    if op.get_context().as_sql:
+        existing = set()
+    else:
+        existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if "users" not in existing:
+        op.create_table(
+            "users",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("email", sa.String()),
+            sa.Column("name", sa.String()),
+            sa.Column("hashed_password", sa.String()),
+            sa.Column("is_active", sa.Boolean()),
+            sa.Column("created_at", sa.DateTime()),
+        )
+        op.create_index("ix_users_id", "users", ["id"])
+        op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    if "events" not in existing:
+        op.create_table(
+            "events",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id")),
+            sa.Column("nomeCliente", sa.String(), nullable=False),
+            sa.Column("tipoEvento", sa.String(), nullable=False),
+            sa.Column("dataOrcamento", sa.Date(), nullable=False),
+            sa.Column("dataEvento", sa.Date(), nullable=False),
+            sa.Column("status", event_status, nullable=False),
+            sa.Column("valorEvento", sa.Float()),
+            sa.Column("iraParcelar", sa.Boolean()),
+            sa.Column("quantParcelas", sa.Integer()),
+            sa.Column("dataPrimeiroPagamento", sa.Date()),
+            sa.Column("contatoCliente", sa.String()),
+            sa.Column("motivoRecusa", sa.String()),
+            sa.Column("created_at", sa.DateTime()),
+        )
+        op.create_index("ix_events_id", "events", ["id"])
+
+    if "leads" not in existing:
+        op.create_table(
+            "leads",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("name", sa.String()),
+            sa.Column("email", sa.String()),
+            sa.Column("phone", sa.String()),
+            sa.Column("created_at", sa.DateTime()),
+        )
+        op.create_index("ix_leads_id", "leads", ["id"])
+
+    if "refresh_tokens" not in existing:
+        op.create_table(
+            "refresh_tokens",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("token", sa.String(), nullable=False),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+            sa.Column("expires_at", sa.DateTime(), nullable=False),
+            sa.Column("created_at", sa.DateTime()),
+        )
+        op.create_index("ix_refresh_tokens_id", "refresh_tokens", ["id"])
+
+
+def downgrade() -> None:
+    op.drop_table("refresh_tokens")
+    op.drop_table("leads")
+    op.drop_table("events")
+    event_status.drop(op.get_bind(), checkfirst=True)
+    op.drop_table("users")
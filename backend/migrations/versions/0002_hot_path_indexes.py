@@ -0,0 +1,58 @@
+"""índices compostos das consultas por usuário
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2025-05-20 10:30:00
+
+Todas as consultas de events filtram por user_id, que até aqui não tinha
+índice. Os índices são criados com CONCURRENTLY (fora de transação) para
+não bloquear escrita em tabelas já populadas.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (nome, tabela, colunas, unique)
+INDEXES = [
+    # get_event / update_event / delete_event
+    ("ix_events_user_id_id", "events", ["user_id", "id"], False),
+    # list_events (paginação por cursor) e filtros por data; o prefixo
+    # (user_id, dataEvento) atende as consultas por intervalo de datas
+    ("ix_events_user_dataevento_id", "events", ["user_id", "dataEvento", "id"], False),
+    # estatísticas do dashboard agrupadas por status
+    ("ix_events_user_status", "events", ["user_id", "status"], False),
+    ("ix_leads_email", "leads", ["email"], False),
+    # lookup do refresh token e limpeza dos expirados por usuário
+    ("ix_refresh_tokens_token", "refresh_tokens", ["token"], True),
+    ("ix_refresh_tokens_user_expires", "refresh_tokens", ["user_id", "expires_at"], False),
+]
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns, unique in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                unique=unique,
+                if_not_exists=True,
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _columns, _unique in reversed(INDEXES):
+            op.drop_index(
+                name,
+                table_name=table,
+                if_exists=True,
+                postgresql_concurrently=True,
+            )
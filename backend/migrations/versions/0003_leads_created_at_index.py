@@ -0,0 +1,39 @@
+"""índice da listagem de leads por data de criação
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2025-05-27 09:00:00
+
+A listagem de leads passou a ser paginada por cursor em (created_at, id)
+e filtrada por intervalo de created_at; o índice atende as duas coisas.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_leads_created_at_id",
+            "leads",
+            ["created_at", "id"],
+            if_not_exists=True,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_leads_created_at_id",
+            table_name="leads",
+            if_exists=True,
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,48 @@
+"""refresh tokens guardados só como hash
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2025-06-03 09:00:00
+
+Troca a coluna token (texto puro) por token_hash (sha256 em hex, único) e
+indexa expires_at para a limpeza periódica dos tokens expirados. Os tokens
+existentes são convertidos no próprio banco, então ninguém é deslogado.
+O downgrade não tem como recuperar os tokens originais: as sessões em
+aberto precisam fazer login de novo.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("refresh_tokens", sa.Column("token_hash", sa.String(64), nullable=True))
+    op.execute(
+        "UPDATE refresh_tokens "
+        "SET token_hash = encode(sha256(convert_to(token, 'UTF8')), 'hex')"
+    )
+    op.alter_column("refresh_tokens", "token_hash", nullable=False)
+    op.create_index("ix_refresh_tokens_token_hash", "refresh_tokens", ["token_hash"], unique=True)
+    op.create_index("ix_refresh_tokens_expires_at", "refresh_tokens", ["expires_at"])
+
+    op.drop_index("ix_refresh_tokens_token", table_name="refresh_tokens", if_exists=True)
+    op.drop_column("refresh_tokens", "token")
+
+
+def downgrade() -> None:
+    op.add_column("refresh_tokens", sa.Column("token", sa.String(), nullable=True))
+    # Os valores antigos não podem ser recuperados; o hash só preenche a coluna
+    op.execute("UPDATE refresh_tokens SET token = token_hash")
+    op.alter_column("refresh_tokens", "token", nullable=False)
+    op.create_index("ix_refresh_tokens_token", "refresh_tokens", ["token"], unique=True)
+
+    op.drop_index("ix_refresh_tokens_expires_at", table_name="refresh_tokens")
+    op.drop_index("ix_refresh_tokens_token_hash", table_name="refresh_tokens")
+    op.drop_column("refresh_tokens", "token_hash")
@@ -0,0 +1,31 @@
+"""versão dos eventos por usuário (ETags)
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2025-06-10 09:00:00
+
+users.events_version é incrementado na mesma transação de toda escrita
+em events; as leituras de eventos derivam o ETag dele. Com server_default
+o ADD COLUMN não reescreve a tabela (PostgreSQL 11+).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "users",
+        sa.Column("events_version", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("users", "events_version")
@@ -0,0 +1,61 @@
+"""resumo mensal de eventos por usuário e status
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2025-06-17 09:00:00
+
+Tabela lida pelas estatísticas do dashboard no lugar de events. É mantida
+pelas escritas da API e preenchida aqui a partir dos eventos existentes.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Tipo criado na 0001
+event_status = postgresql.ENUM(
+    "orcamento_recebido",
+    "proposta_enviada",
+    "proposta_aceita",
+    "proposta_recusada",
+    name="eventstatus",
+    create_type=False,
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "event_monthly_summary",
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("year", sa.Integer(), nullable=False),
+        sa.Column("month", sa.Integer(), nullable=False),
+        sa.Column("status", event_status, nullable=False),
+        sa.Column("eventos", sa.Integer(), nullable=False),
+        sa.Column("valor", sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint("user_id", "year", "month", "status"),
+    )
+    op.execute(
+        """
+        INSERT INTO event_monthly_summary (user_id, year, month, status, eventos, valor)
+        SELECT user_id,
+               EXTRACT(YEAR FROM "dataEvento")::int,
+               EXTRACT(MONTH FROM "dataEvento")::int,
+               status,
+               COUNT(*),
+               COALESCE(SUM("valorEvento"), 0)
+        FROM events
+        WHERE user_id IS NOT NULL
+        GROUP BY 1, 2, 3, 4
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("event_monthly_summary")
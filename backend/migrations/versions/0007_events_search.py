@@ -0,0 +1,65 @@
+"""busca de eventos por cliente, tipo e contato
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2025-06-24 09:00:00
+
+Índice GIN de trigramas (pg_trgm) sobre o texto normalizado do evento,
+sem acentos (unaccent) e em minúsculas. btree_gin permite colocar
+user_id no mesmo índice, então a busca de um usuário não percorre os
+eventos dos outros.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "0007"
+down_revision: Union[str, None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gin")
+
+    # unaccent() é STABLE (depende do search_path); com o dicionário
+    # explícito o resultado é fixo e a função pode ser usada em índices
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION f_unaccent(text) RETURNS text
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+        AS $$ SELECT public.unaccent('public.unaccent'::regdictionary, $1) $$
+        """
+    )
+    # Mesma expressão no índice e nas consultas (app/routers/events.py)
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION events_search_text(text, text, text) RETURNS text
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE
+        AS $$ SELECT public.f_unaccent(lower(
+            coalesce($1, '') || ' ' || coalesce($2, '') || ' ' || coalesce($3, '')
+        )) $$
+        """
+    )
+
+    with op.get_context().autocommit_block():
+        op.execute(
+            """
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_events_search_trgm ON events
+            USING gin (
+                user_id,
+                events_search_text("nomeCliente", "tipoEvento", "contatoCliente") gin_trgm_ops
+            )
+            """
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_events_search_trgm")
+    op.execute("DROP FUNCTION IF EXISTS events_search_text(text, text, text)")
+    op.execute("DROP FUNCTION IF EXISTS f_unaccent(text)")
+    # As extensões ficam: podem ser usadas por outros objetos do banco
@@ -0,0 +1,46 @@
+"""Recalcula a tabela event_monthly_summary a partir de events.
+
+Uso (a partir de backend/):
+    python -m scripts.rebuild_event_summary            # todos os usuários
+    python -m scripts.rebuild_event_summary --user-id 42
+
+O resumo é mantido pelas escritas da API; este comando corrige qualquer
+divergência (ex.: eventos alterados direto no banco). Roda em uma
+transação: leituras concorrentes veem o resumo antigo até o commit, e
+escritas da API ficam esperando o lock da tabela para aplicar seus deltas
+sobre o resumo já recalculado.
+"""
+import argparse
+
+from sqlalchemy import func, select, text
+
+from app.core.database import SessionLocal
+from app.models.models import EventMonthlySummary
+from app.services.event_summary import rebuild_statements
+
+
+def rebuild(user_id=None) -> int:
+    with SessionLocal() as db:
+        # Bloqueia os upserts concorrentes (mas não as leituras) até o commit
+        db.execute(text("LOCK TABLE event_monthly_summary IN EXCLUSIVE MODE"))
+        for stmt in rebuild_statements(user_id):
+            db.execute(stmt)
+        query = select(func.count()).select_from(EventMonthlySummary)
+        if user_id is not None:
+            query = query.where(EventMonthlySummary.user_id == user_id)
+        rows = db.scalar(query)
+        db.commit()
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--user-id", type=int, help="recalcula só os eventos deste usuário")
+    args = parser.parse_args(argv)
+
+    rows = rebuild(args.user_id)
+    print(f"event_monthly_summary recalculada: {rows} linhas")
+
+
+if __name__ == "__main__":
+    main()
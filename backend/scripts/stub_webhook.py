@@ -0,0 +1,63 @@
+"""Webhook local que imita o N8N para testar o envio de leads.
+
+Uso (a partir de backend/):
+    python scripts/stub_webhook.py --port 8099 --fail-rate 0.3
+    N8N_WEBHOOK_URL=http://127.0.0.1:8099/webhook uvicorn app.main:app
+
+Cada requisição recebida é impressa como uma linha JSON. Com --fail-rate
+uma fração das requisições responde 503, para exercitar as retentativas.
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def make_handler(fail_rate: float, delay: float, status_code: int):
+    class StubHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            if delay:
+                time.sleep(delay)
+
+            code = 503 if random.random() < fail_rate else status_code
+            try:
+                payload = json.loads(body or b"null")
+            except ValueError:
+                payload = body.decode(errors="replace")
+            print(json.dumps({"path": self.path, "status": code, "payload": payload}, ensure_ascii=False), flush=True)
+
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            self.wfile.write(b'{"ok": true}' if code < 400 else b'{"ok": false}')
+
+        def log_message(self, format, *args):
+            pass
+
+    return StubHandler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="fração de requisições que respondem 503")
+    parser.add_argument("--delay", type=float, default=0.0, help="atraso de cada resposta, em segundos")
+    parser.add_argument("--status", type=int, default=200, help="status das respostas que não falham")
+    args = parser.parse_args(argv)
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(args.fail_rate, args.delay, args.status))
+    print(f"Stub do webhook em http://{args.host}:{args.port}", file=sys.stderr, flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
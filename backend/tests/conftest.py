@@ -0,0 +1,11 @@
+import os
+
+# Os módulos da aplicação leem a configuração no import; as engines só
+# conectam no primeiro uso, então os testes que não tocam o banco rodam
+# sem PostgreSQL
+os.environ.setdefault("SECRET_KEY", "segredo-dos-testes")
+os.environ.setdefault("DB_USER", "postgres")
+os.environ.setdefault("DB_PASS", "postgres")
+os.environ.setdefault("DB_HOST", "localhost")
+os.environ.setdefault("DB_PORT", "5432")
+os.environ.setdefault("DB_NAME", "postgres")
@@ -0,0 +1,100 @@
+import asyncio
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+
+from app.routers import events
+from app.schemas.schemas import EventBatchItemResult
+
+DIA_1 = date(2030, 5, 10)
+DIA_2 = date(2030, 5, 11)
+DIA_3 = date(2030, 5, 12)
+
+
+@pytest.fixture
+def stored(monkeypatch):
+    """Propostas aceitas "no banco": data -> ids"""
+    accepted = {}
+
+    async def fake_booking_conflicts(db, user_id, dates, exclude_id=None):
+        return {d: list(accepted[d]) for d in set(dates) if d in accepted}
+
+    monkeypatch.setattr(events, "_booking_conflicts", fake_booking_conflicts)
+    return accepted
+
+
+def _update(event_id, data_atual, status_atual, **changes):
+    row = SimpleNamespace(dataEvento=data_atual, status=status_atual)
+    result = EventBatchItemResult(id=event_id, acao="atualizar", ok=True)
+    return result, row, changes
+
+
+def _delete(event_id, data_atual, status_atual):
+    row = SimpleNamespace(dataEvento=data_atual, status=status_atual)
+    return EventBatchItemResult(id=event_id, acao="excluir", ok=True), row, {}
+
+
+def _check(ops, reject):
+    asyncio.run(events._batch_booking_conflicts(None, 1, ops, reject))
+    return {result.id: (result.ok, result.conflitos) for result, _, _ in ops}
+
+
+@pytest.mark.parametrize("reject", [False, True])
+def test_two_items_moved_to_same_date(stored, reject):
+    ops = [
+        _update(1, DIA_1, "orcamento_recebido", dataEvento=DIA_3, status="proposta_aceita"),
+        _update(2, DIA_2, "proposta_enviada", dataEvento=DIA_3, status="proposta_aceita"),
+    ]
+
+    assert _check(ops, reject) == {1: (not reject, [2]), 2: (not reject, [1])}
+    if reject:
+        assert ops[0][0].erro == f"Já existe proposta aceita em {DIA_3.isoformat()} (eventos 2)"
+
+
+def test_conflict_with_stored_event(stored):
+    stored[DIA_1] = [10]
+    ops = [_update(1, DIA_2, "proposta_aceita", dataEvento=DIA_1)]
+
+    assert _check(ops, False) == {1: (True, [10])}
+
+
+def test_rejected_item_keeps_its_date_and_conflicts_with_another(stored):
+    # O evento 1 (aceito no DIA_1) tenta ir para o DIA_2, ocupado pelo 10
+    stored[DIA_1] = [1]
+    stored[DIA_2] = [10]
+    ops = [
+        _update(1, DIA_1, "proposta_aceita", dataEvento=DIA_2),
+        _update(3, DIA_3, "proposta_enviada", dataEvento=DIA_1, status="proposta_aceita"),
+    ]
+
+    # Sem reject o 1 sai do DIA_1 e o 3 pode ocupá-lo
+    assert _check(ops, False) == {1: (True, [10]), 3: (True, [])}
+
+    ops = [
+        _update(1, DIA_1, "proposta_aceita", dataEvento=DIA_2),
+        _update(3, DIA_3, "proposta_enviada", dataEvento=DIA_1, status="proposta_aceita"),
+    ]
+
+    # Com reject o 1 fica no DIA_1, e o 3 passa a conflitar com ele
+    assert _check(ops, True) == {1: (False, [10]), 3: (False, [1])}
+
+
+def test_delete_in_same_batch_frees_date(stored):
+    stored[DIA_1] = [1]
+    ops = [
+        _delete(1, DIA_1, "proposta_aceita"),
+        _update(2, DIA_2, "proposta_enviada", dataEvento=DIA_1, status="proposta_aceita"),
+    ]
+
+    assert _check(ops, True) == {1: (True, []), 2: (True, [])}
+
+
+def test_declined_proposal_does_not_take_the_date(stored):
+    stored[DIA_1] = [10]
+    ops = [
+        _update(1, DIA_2, "proposta_enviada", dataEvento=DIA_1, status="proposta_recusada", motivoRecusa="x"),
+        _update(2, DIA_3, "proposta_aceita", status="proposta_recusada", motivoRecusa="x"),
+    ]
+
+    assert _check(ops, True) == {1: (True, []), 2: (True, [])}
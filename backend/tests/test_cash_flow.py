@@ -0,0 +1,78 @@
+from datetime import date
+
+from app.services.cash_flow import month_labels, project
+
+
+def _month(year: int, month: int) -> int:
+    return year * 12 + month - 1
+
+
+START = date(2025, 3, 15)
+
+
+def test_event_starting_before_window_keeps_only_remaining_installments():
+    # 6 parcelas de 100 a partir de jan/2025: jan e fev ficam fora da janela
+    totals, counts = project([600.0], [6], [_month(2025, 1)], START, 3)
+
+    assert totals.tolist() == [100.0, 100.0, 100.0]
+    assert counts.tolist() == [1, 1, 1]
+
+
+def test_event_running_past_window_end():
+    # Começa no último mês da janela: só a primeira parcela entra
+    totals, counts = project([300.0], [3], [_month(2025, 5)], START, 3)
+
+    assert totals.tolist() == [0.0, 0.0, 100.0]
+    assert counts.tolist() == [0, 0, 1]
+
+
+def test_event_entirely_after_window():
+    totals, counts = project([500.0], [2], [_month(2025, 6)], START, 3)
+
+    assert totals.tolist() == [0.0, 0.0, 0.0]
+    assert counts.tolist() == [0, 0, 0]
+
+
+def test_leftover_cents_go_to_last_installment():
+    totals, counts = project([100.0], [3], [_month(2025, 3)], START, 3)
+
+    assert totals.tolist() == [33.33, 33.33, 33.34]
+    assert counts.tolist() == [1, 1, 1]
+    assert round(totals.sum(), 2) == 100.0
+
+
+def test_leftover_cents_when_window_starts_mid_event():
+    # Só a última parcela (com os centavos) fica dentro da janela
+    totals, _ = project([100.0], [3], [_month(2025, 1)], START, 3)
+
+    assert totals.tolist() == [33.34, 0.0, 0.0]
+
+
+def test_single_installment_on_window_boundaries():
+    valores = [10.0, 20.0, 30.0, 40.0]
+    primeiros = [_month(2025, 2), _month(2025, 3), _month(2025, 5), _month(2025, 6)]
+    totals, counts = project(valores, [1, 1, 1, 1], primeiros, START, 3)
+
+    # O mês anterior e o seguinte à janela ficam de fora; o primeiro e o último entram
+    assert totals.tolist() == [20.0, 0.0, 30.0]
+    assert counts.tolist() == [1, 0, 1]
+
+
+def test_events_in_the_same_month_are_summed():
+    totals, counts = project(
+        [100.0, 50.0, 90.0], [1, 2, 3], [_month(2025, 3)] * 3, START, 2
+    )
+
+    assert totals.tolist() == [155.0, 55.0]
+    assert counts.tolist() == [3, 2]
+
+
+def test_empty_input():
+    totals, counts = project([], [], [], START, 2)
+
+    assert totals.tolist() == [0.0, 0.0]
+    assert counts.tolist() == [0, 0]
+
+
+def test_month_labels_cross_year():
+    assert month_labels(date(2025, 11, 30), 3) == [(2025, 11), (2025, 12), (2026, 1)]
@@ -0,0 +1,31 @@
+import io
+
+from app.schemas.schemas import EventStatus
+from app.services.event_import import iter_csv_rows, read_chunk
+
+
+def _read(csv_text: str):
+    return read_chunk(iter_csv_rows(io.BytesIO(csv_text.encode("utf-8"))))
+
+
+def test_blank_status_uses_schema_default():
+    count, valid, errors = _read(
+        "nomeCliente;tipoEvento;dataOrcamento;dataEvento;status;contatoCliente;iraParcelar\n"
+        "Ana;Casamento;2025-01-10;2030-05-20;;;\n"
+    )
+
+    assert (count, errors) == (1, [])
+    assert valid[0].status == EventStatus.orcamento_recebido
+    assert valid[0].iraParcelar is False
+    assert valid[0].contatoCliente is None
+
+
+def test_blank_required_field_is_reported():
+    count, valid, errors = _read(
+        "nomeCliente,tipoEvento,dataOrcamento,dataEvento,status,contatoCliente\n"
+        ",Casamento,2025-01-10,2030-05-20,proposta_enviada,\n"
+    )
+
+    assert (count, valid) == (1, [])
+    assert errors[0]["linha"] == 2
+    assert [e["campo"] for e in errors[0]["erros"]] == ["nomeCliente"]
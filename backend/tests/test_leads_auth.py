@@ -0,0 +1,16 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+# Sem o bloco "with": o lifespan (que conecta ao banco) não roda, e a
+# autenticação recusa a requisição antes de qualquer consulta
+client = TestClient(app, base_url="http://localhost")
+
+
+@pytest.mark.parametrize("path", ["/api/leads/", "/api/leads/?format=ndjson", "/api/leads/stats"])
+def test_lead_reads_require_token(path):
+    response = client.get(path)
+
+    assert response.status_code == 401
+    assert response.headers["www-authenticate"] == "Bearer"
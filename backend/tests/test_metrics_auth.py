@@ -0,0 +1,30 @@
+from fastapi.testclient import TestClient
+
+import app.main as main
+
+client = TestClient(main.app, base_url="http://localhost")
+
+
+def test_metrics_closed_without_token(monkeypatch):
+    monkeypatch.setattr(main, "METRICS_TOKEN", None)
+    monkeypatch.setattr(main, "METRICS_PUBLIC", False)
+
+    assert client.get("/metrics").status_code == 404
+
+
+def test_metrics_requires_configured_token(monkeypatch):
+    monkeypatch.setattr(main, "METRICS_TOKEN", "segredo")
+    monkeypatch.setattr(main, "METRICS_PUBLIC", False)
+
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer outro"}).status_code == 401
+    response = client.get("/metrics", headers={"Authorization": "Bearer segredo"})
+    assert response.status_code == 200
+    assert "http_requests_in_flight" in response.text
+
+
+def test_metrics_public_opt_in(monkeypatch):
+    monkeypatch.setattr(main, "METRICS_TOKEN", None)
+    monkeypatch.setattr(main, "METRICS_PUBLIC", True)
+
+    assert client.get("/metrics").status_code == 200